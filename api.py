@@ -4,6 +4,9 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import traceback
 import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
 
 # Import existing modules
 from modules import (
@@ -49,6 +52,23 @@ class TickerOption(BaseModel):
 class CompareRequest(BaseModel):
     symbols: List[str]
 
+# ==================== Helpers ====================
+
+def _df_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    DataFrame rows as JSON-safe dicts: the Date index becomes an ISO string
+    and NaN/inf become None, converted column-wise rather than per cell.
+    """
+    out = df.reset_index()
+    if 'Date' in out.columns:
+        dates = out['Date']
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            out['Date'] = dates.map(pd.Timestamp.isoformat)
+        else:
+            out['Date'] = dates.astype(str)
+    out = out.replace([np.inf, -np.inf], np.nan)
+    return out.astype(object).where(out.notna(), None).to_dict('records')
+
 # ==================== API Endpoints ====================
 
 @app.get("/")
@@ -61,7 +81,7 @@ async def root():
     }
 
 @app.get("/api/search")
-async def search_stocks(query: str = Query(..., min_length=1)):
+def search_stocks(query: str = Query(..., min_length=1)):
     """
     Search for stocks by company name or ticker symbol
     Returns list of matching ticker options
@@ -86,12 +106,12 @@ async def search_stocks(query: str = Query(..., min_length=1)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stock/{symbol}")
-async def get_stock_data(symbol: str):
+def get_stock_data(symbol: str):
     """
     Get comprehensive stock data including fundamentals, metrics, and profile
     """
     try:
-        metrics, figs, profile_info = fundamentals.get_fundamentals(symbol)
+        metrics, figs, profile_info, _ = fundamentals.get_fundamentals(symbol)
         
         if "Error" in metrics:
             raise HTTPException(status_code=404, detail=f"No data found for symbol: {symbol}")
@@ -121,7 +141,7 @@ async def get_stock_data(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stock/{symbol}/chart")
-async def get_stock_chart(
+def get_stock_chart(
     symbol: str, 
     period: str = Query("2y", regex="^(1d|5d|1mo|3mo|6mo|1y|2y|5y|10y|ytd|max)$"),
     interval: str = Query("1d", regex="^(1m|2m|5m|15m|30m|60m|90m|1h|1d|5d|1wk|1mo|3mo)$")
@@ -140,22 +160,7 @@ async def get_stock_chart(
         df['MA200'] = df['Close'].rolling(200).mean()
         
         # Convert to dict for JSON response
-        data = df.reset_index().to_dict('records')
-        
-        # Convert Timestamp to string and NaN to None for JSON compatibility
-        import math
-        for record in data:
-            if 'Date' in record:
-                date_val = record['Date']
-                if hasattr(date_val, 'isoformat'):
-                    record['Date'] = date_val.isoformat()
-                elif not isinstance(date_val, str):
-                    record['Date'] = str(date_val)
-            
-            # Replace NaN with None for JSON serialization
-            for key, value in list(record.items()):
-                if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
-                    record[key] = None
+        data = _df_to_records(df)
         
         return {
             "symbol": symbol,
@@ -170,7 +175,7 @@ async def get_stock_chart(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stock/{symbol}/technicals")
-async def get_technicals(symbol: str):
+def get_technicals(symbol: str):
     """
     Get technical indicators (RSI, MACD, Bollinger Bands)
     """
@@ -181,28 +186,11 @@ async def get_technicals(symbol: str):
             raise HTTPException(status_code=404, detail=f"No data for technical analysis: {symbol}")
         
         # Calculate indicators
-        technicals.calculate_bbands(df)
-        technicals.calculate_rsi(df)
-        technicals.calculate_macd(df)
+        df = technicals.calculate_all(df)
         df = df.dropna()
         
         # Convert to dict
-        data = df.reset_index().to_dict('records')
-        
-        # Convert Timestamp to string and NaN to None for JSON compatibility
-        import math
-        for record in data:
-            if 'Date' in record:
-                date_val = record['Date']
-                if hasattr(date_val, 'isoformat'):
-                    record['Date'] = date_val.isoformat()
-                elif not isinstance(date_val, str):
-                    record['Date'] = str(date_val)
-            
-            # Replace NaN with None for JSON serialization
-            for key, value in list(record.items()):
-                if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
-                    record[key] = None
+        data = _df_to_records(df)
         
         return {
             "symbol": symbol,
@@ -215,27 +203,29 @@ async def get_technicals(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stock/{symbol}/forecast")
-async def get_forecast(symbol: str):
+def get_forecast(symbol: str):
     """
     Get price forecast, recommendation, sentiment, and accuracy metrics
     """
     try:
-        # 1. Sentiment analysis
-        _, sentiment_fig, sentiment_score = sentiment.analyze_sentiment(symbol)
-        
-        # 2. Generate 30-day forecast for recommendation
-        hist_df_30d, simulations_30d, _ = forecast.generate_forecast(symbol, period=30, num_simulations=100)
-        
-        # 3. Generate recommendation
+        # 1. Sentiment, the 30-day (recommendation) and 90-day (visualization)
+        #    forecasts and the backtest are independent; run them concurrently
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            sentiment_f = ex.submit(sentiment.analyze_sentiment, symbol)
+            forecast_30d_f = ex.submit(forecast.generate_forecast, symbol, period=30, num_simulations=100)
+            forecast_90d_f = ex.submit(forecast.generate_forecast, symbol, period=90, num_simulations=100)
+            backtest_f = ex.submit(accuracy.run_backtest, symbol, forecast_days=30, num_simulations=100)
+        _, sentiment_fig, sentiment_score = sentiment_f.result()
+        hist_df_30d, simulations_30d, _ = forecast_30d_f.result()
+        hist_df_90d, simulations_90d, future_dates_90d = forecast_90d_f.result()
+        accuracy_results = backtest_f.result()
+        
+        # 2. Generate recommendation
         rec_text, rec_fig = recommendation.get_recommendation(symbol, hist_df_30d, simulations_30d, sentiment_score)
         
-        # 4. Generate 90-day forecast for visualization
-        hist_df_90d, simulations_90d, future_dates_90d = forecast.generate_forecast(symbol, period=90, num_simulations=100)
+        # 3. Generate 90-day forecast for visualization
         forecast_fig = forecast.plot_forecast(hist_df_90d, simulations_90d, future_dates_90d, sentiment_score)
         
-        # 5. Run accuracy backtest
-        accuracy_results = accuracy.run_backtest(symbol, forecast_days=30, num_simulations=100)
-        
         # Convert figures to base64
         import io
         import base64
@@ -272,7 +262,7 @@ async def get_forecast(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stock/{symbol}/sentiment")
-async def get_sentiment(symbol: str):
+def get_sentiment(symbol: str):
     """
     Get sentiment analysis for a stock
     """
@@ -299,7 +289,7 @@ async def get_sentiment(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stock/{symbol}/insights")
-async def get_insights(symbol: str):
+def get_insights(symbol: str):
     """
     Get AI-generated insights for a stock
     """
@@ -314,7 +304,7 @@ async def get_insights(symbol: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/market/indices")
-async def get_market_indices():
+def get_market_indices():
     """
     Get market overview with major indices
     """
@@ -357,7 +347,7 @@ async def get_market_indices():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/compare")
-async def compare_stocks(request: CompareRequest):
+def compare_stocks(request: CompareRequest):
     """
     Compare multiple stocks
     """
@@ -6,6 +6,8 @@ from modules import data_fetch, sentiment, forecast, fundamentals, insights, com
 
     
 import traceback, base64, os
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go 
@@ -50,6 +52,8 @@ if 'last_query' not in st.session_state:
     st.session_state.last_query = ""
 if 'key_metrics' not in st.session_state:
     st.session_state.key_metrics = {}
+if 'key_metrics_num' not in st.session_state:
+    st.session_state.key_metrics_num = {}
 if 'figs' not in st.session_state:
     st.session_state.figs = {}
     
@@ -78,7 +82,7 @@ def set_analysis_ticker(ticker_symbol):
     """
     with st.spinner(f"Loading data for {ticker_symbol}..."):
         try:
-            metrics, figs, profile_info = fundamentals.get_fundamentals(ticker_symbol)
+            metrics, figs, profile_info, metrics_num = fundamentals.get_fundamentals(ticker_symbol)
             if "Error" in metrics:
                  st.error(f"❌ No data found for symbol: **{ticker_symbol}**. Check symbol.")
                  return
@@ -86,6 +90,7 @@ def set_analysis_ticker(ticker_symbol):
             # Store primary data
             st.session_state.ticker = ticker_symbol
             st.session_state.key_metrics = metrics
+            st.session_state.key_metrics_num = metrics_num
             st.session_state.figs = figs
             st.session_state.profile_info = profile_info
             
@@ -101,22 +106,31 @@ def set_analysis_ticker(ticker_symbol):
             
     with st.spinner(f"Generating forecasts and ratings for {ticker_symbol}..."):
         try:
-            # 1. Get sentiment score
-            _, sentiment_fig, sentiment_score = sentiment.analyze_sentiment(ticker_symbol)
+            # 1. Sentiment, both forecasts (30 days for rating, 90 for plot - 200
+            #    simulations each) and the 30-day backtest are independent, so
+            #    they run side by side. Each worker gets this session's script
+            #    context so st.cache_data and friends work from it.
+            ctx = get_script_run_ctx()
+            with ThreadPoolExecutor(max_workers=4, initializer=add_script_run_ctx,
+                                    initargs=(None, ctx)) as ex:
+                sentiment_f = ex.submit(sentiment.analyze_sentiment, ticker_symbol)
+                forecast_30d_f = ex.submit(forecast.generate_forecast, ticker_symbol, period=30, num_simulations=200)
+                forecast_90d_f = ex.submit(forecast.generate_forecast, ticker_symbol, period=90, num_simulations=200)
+                backtest_f = ex.submit(accuracy.run_backtest, ticker_symbol, forecast_days=30, num_simulations=200)
+            _, sentiment_fig, sentiment_score = sentiment_f.result()
+            hist_df_30d, simulations_30d, _ = forecast_30d_f.result()
+            hist_df_90d, simulations_90d, future_dates_90d = forecast_90d_f.result()
+            accuracy_results = backtest_f.result()
             
-            # 2. Generate forecast (for 30 days for rating, 90 for plot) - USING 200 SIMULATIONS
-            hist_df_30d, simulations_30d, _ = forecast.generate_forecast(ticker_symbol, period=30, num_simulations=200)
+            # 2. Generate recommendation
+            rec_text, rec_fig = recommendation.get_recommendation(
+                ticker_symbol, hist_df_30d, simulations_30d, sentiment_score,
+                metrics_num=st.session_state.key_metrics_num,
+            )
             
-            # 3. Generate recommendation
-            rec_text, rec_fig = recommendation.get_recommendation(ticker_symbol, hist_df_30d, simulations_30d, sentiment_score)
-            
-            # 4. Generate the 90-day forecast plot
-            hist_df_90d, simulations_90d, future_dates_90d = forecast.generate_forecast(ticker_symbol, period=90, num_simulations=200)
+            # 3. Generate the 90-day forecast plot
             forecast_fig = forecast.plot_forecast(hist_df_90d, simulations_90d, future_dates_90d, sentiment_score)
             
-            # 5. Run accuracy backtest (30-day)
-            accuracy_results = accuracy.run_backtest(ticker_symbol, forecast_days=30, num_simulations=200)
-            
             # 6. Store everything in session state
             st.session_state.rec_text = rec_text
             st.session_state.rec_fig = rec_fig
@@ -142,6 +156,7 @@ def navigate_to_analysis(input_company):
     st.session_state.show_disambiguation = False
     st.session_state.last_query = input_company
     st.session_state.key_metrics = {}
+    st.session_state.key_metrics_num = {}
     st.session_state.profile_info = {}
     st.session_state.figs = {}
     st.session_state.rec_text = ""
@@ -416,9 +431,7 @@ with main_container:
                             st.error("Could not load historical data for technical analysis.")
                         else:
                             # 1. Calculate Indicators
-                            technicals.calculate_bbands(df)
-                            technicals.calculate_rsi(df)
-                            technicals.calculate_macd(df)
+                            df = technicals.calculate_all(df)
                             df = df.dropna() 
 
                             # 2. Chart 1: Bollinger Bands
@@ -0,0 +1,26 @@
+# modules/_yf_cache.py
+"""
+Shared 15-minute caches around the raw yfinance calls, so fundamentals,
+insights and forecast make one request per ticker instead of one each.
+"""
+import streamlit as st
+import yfinance as yf
+import pandas as pd
+
+
+@st.cache_data(ttl=900, show_spinner=False)
+def cached_info(ticker: str) -> dict:
+    """yf.Ticker(ticker).info as a plain dict ({} when Yahoo has nothing)."""
+    return dict(yf.Ticker(ticker).info or {})
+
+
+@st.cache_data(ttl=900, show_spinner=False)
+def cached_history(ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+    """
+    yf.Ticker(ticker).history(...) with a tz-naive DatetimeIndex, matching
+    what yf.download returns for the same window.
+    """
+    hist = yf.Ticker(ticker).history(period=period, interval=interval)
+    if isinstance(hist.index, pd.DatetimeIndex) and hist.index.tz is not None:
+        hist.index = hist.index.tz_localize(None)
+    return hist
@@ -7,9 +7,12 @@ Implements backtesting and accuracy metrics for forecast models.
 import numpy as np
 import pandas as pd
 import yfinance as yf
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from typing import Dict, List, Tuple
 import warnings
+from modules import forecast
 warnings.filterwarnings("ignore")
 
 try:
@@ -17,6 +20,9 @@ try:
 except Exception:
     Prophet = None
 
+# Lower-cased spellings of the price column, mapped to a preference rank
+_PRICE_COLUMNS = {"adj close": 0, "adjclose": 0, "close": 1, "close price": 2}
+
 
 def calculate_metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
     """
@@ -115,7 +121,8 @@ def get_accuracy_score(metrics: Dict[str, float], avg_price: float) -> float:
         return 0.0
 
 
-def run_backtest(ticker: str, forecast_days: int = 30, num_simulations: int = 200) -> Dict:
+def run_backtest(ticker: str, forecast_days: int = 30, num_simulations: int = 200,
+                 use_prophet: bool = False) -> Dict:
     """
     Run a backtest by forecasting from a past date and comparing to actual prices.
     
@@ -127,6 +134,8 @@ def run_backtest(ticker: str, forecast_days: int = 30, num_simulations: int = 20
         Number of days to forecast
     num_simulations : int
         Number of Monte Carlo simulations
+    use_prophet : bool
+        Fit the trend with Prophet instead of forecast.fit_trend
         
     Returns
     -------
@@ -135,7 +144,9 @@ def run_backtest(ticker: str, forecast_days: int = 30, num_simulations: int = 20
     """
     try:
         # Download extended historical data
-        data = yf.download(ticker, period="1y", interval="1d", progress=False)
+        # Flat columns even for a single symbol (no (field, ticker) MultiIndex)
+        data = yf.download(ticker, period="1y", interval="1d", progress=False,
+                           auto_adjust=True, threads=False, multi_level_index=False)
         if data.empty or len(data) < forecast_days + 60:
             return {'error': 'Insufficient data for backtesting'}
         
@@ -144,26 +155,14 @@ def run_backtest(ticker: str, forecast_days: int = 30, num_simulations: int = 20
         train_data = data.iloc[:split_idx].copy()
         test_data = data.iloc[split_idx:].copy()
         
-        # Prepare data for Prophet
+        # Prepare data for the trend model
         df = train_data.reset_index()
-        df.columns = [str(col).lower() for col in df.columns]
+        df.columns = df.columns.astype(str).str.lower().str.strip()
         
         # Find date and price columns
         date_col = 'date' if 'date' in df.columns else df.columns[0]
-        
-        # Try to find close/adj close column
-        price_col = None
-        for col in ['adj close', 'close', 'adjclose']:
-            if col in df.columns:
-                price_col = col
-                break
-        
-        # If still not found, look for any column with 'close' in the name
-        if price_col is None:
-            for col in df.columns:
-                if 'close' in col.lower():
-                    price_col = col
-                    break
+        ranked = [(_PRICE_COLUMNS[c], c) for c in df.columns if c in _PRICE_COLUMNS]
+        price_col = min(ranked)[1] if ranked else next((c for c in df.columns if 'close' in c), None)
         
         if price_col is None:
             return {'error': 'Could not find price column in data'}
@@ -172,39 +171,45 @@ def run_backtest(ticker: str, forecast_days: int = 30, num_simulations: int = 20
         df.columns = ['ds', 'y']
         df['ds'] = pd.to_datetime(df['ds'])
         
-        # Run Prophet forecast
-        if Prophet is None:
-            return {'error': 'Prophet not installed'}
-        
-        model = Prophet(
-            daily_seasonality=True,
-            weekly_seasonality=False,
-            yearly_seasonality=True,
-            changepoint_prior_scale=0.05
-        )
-        model.fit(df)
-        
-        future = model.make_future_dataframe(periods=forecast_days)
-        forecast_df = model.predict(future)
-        
-        # Get forecasted values
-        last_actual_date = df['ds'].max()
-        forecast_part = forecast_df[forecast_df['ds'] > last_actual_date]
+        # Fit the trend
+        if use_prophet:
+            if Prophet is None:
+                return {'error': 'Prophet not installed'}
+            
+            model = Prophet(
+                daily_seasonality=True,
+                weekly_seasonality=False,
+                yearly_seasonality=True,
+                changepoint_prior_scale=0.05
+            )
+            model.fit(df)
+            
+            future = model.make_future_dataframe(periods=forecast_days)
+            forecast_df = model.predict(future)
+            
+            # Get forecasted values
+            last_actual_date = df['ds'].max()
+            yhat = forecast_df.loc[forecast_df['ds'] > last_actual_date, 'yhat'].to_numpy()
+        else:
+            _, yhat = forecast.fit_trend(df, forecast_days, flexibility=0.05)
         
         # Calculate volatility from training data
-        df['log_return'] = np.log(df['y'] / df['y'].shift(1))
-        volatility = df['log_return'].std()
+        y = df['y'].to_numpy(dtype=np.float64)
+        volatility = np.log(y[1:] / y[:-1]).std(ddof=1)
         
         # Run Monte Carlo simulations
         last_price = df['y'].iloc[-1]
-        prophet_trend = forecast_part['yhat'].pct_change().fillna(0).values
+        trend_drift = np.zeros(len(yhat))
+        trend_drift[1:] = yhat[1:] / yhat[:-1] - 1
         
-        simulations = np.zeros((min(forecast_days, len(prophet_trend)), num_simulations))
+        # Every column is overwritten below, so no zero-fill; float32 is ample
+        # for a median and halves the buffer the percentile has to scan
+        simulations = np.empty((min(forecast_days, len(trend_drift)), num_simulations), dtype=np.float32)
         
         for i in range(num_simulations):
             prices = [last_price]
-            for day in range(min(forecast_days - 1, len(prophet_trend) - 1)):
-                drift = prophet_trend[day]
+            for day in range(min(forecast_days - 1, len(trend_drift) - 1)):
+                drift = trend_drift[day]
                 random_shock = np.random.normal(0, volatility)
                 next_price = prices[-1] * (1 + drift + random_shock)
                 prices.append(next_price)
@@ -258,14 +263,14 @@ def plot_backtest_results(results: Dict) -> plt.Figure:
         Matplotlib figure
     """
     if 'error' in results:
-        fig, ax = plt.subplots(figsize=(10, 4))
+        fig, ax = plt.subplots(figsize=(10, 4), layout="constrained")
         ax.text(0.5, 0.5, f"Error: {results['error']}", 
                 ha='center', va='center', fontsize=12, color='red')
         ax.set_facecolor('#121A2A')
         fig.patch.set_facecolor('#121A2A')
         return fig
     
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig, ax = plt.subplots(figsize=(10, 5), layout="constrained")
     
     # Theme colors
     BG_COLOR = "#121A2A"
@@ -304,8 +309,6 @@ def plot_backtest_results(results: Dict) -> plt.Figure:
     ax.set_xlabel('Date', color=TEXT_COLOR)
     ax.set_ylabel('Price', color=TEXT_COLOR)
     ax.grid(True, color=BORDER_COLOR, alpha=0.3, linestyle='--')
-    
-    plt.tight_layout()
     return fig
 
 
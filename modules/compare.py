@@ -1,26 +1,11 @@
 import streamlit as st
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from modules import fundamentals # Import the new module
 
-# =====================================================
-# ✅ Utility: Convert string metrics to float safely
-# =====================================================
-def safe_to_float(val):
-    try:
-        if isinstance(val, (int, float)):
-            return float(val)
-        if isinstance(val, str):
-            val = val.replace("%", "").replace("$", "").replace(",", "").strip()
-            if val in ["N/A", "", "-", "nan"]:
-                return np.nan
-            return float(val)
-    except Exception:
-        return np.nan
-    return np.nan
-
-
 # =====================================================
 # ✅ Core Comparison Function — Modular 2x2 Layout (Revised)
 # =====================================================
@@ -34,10 +19,11 @@ def compare_companies(resolved_symbols):
 
     metrics_list = []
     
-    # 2. FETCH FUNDAMENTALS FOR RESOLVED TICKERS
+    # 2. FETCH FUNDAMENTALS FOR RESOLVED TICKERS (network I/O runs in parallel)
+    fundamentals_by_ticker = fundamentals.get_fundamentals_batch(resolved_symbols, with_figs=False)
     for ticker in resolved_symbols:
         try:
-            data, _, _ = fundamentals.get_fundamentals(ticker)
+            data, _, _, data_num = fundamentals_by_ticker[ticker]
             
             if "Error" in data:
                 print(f"Skipping {ticker}: {data['Error']}")
@@ -45,10 +31,10 @@ def compare_companies(resolved_symbols):
                 
             metrics_list.append({
                 "Ticker": ticker,
-                "P/E Ratio": safe_to_float(data.get("P/E Ratio", np.nan)),
-                "ROE": safe_to_float(data.get("ROE", np.nan)),
-                "Debt-to-Equity": safe_to_float(data.get("Debt-to-Equity", np.nan)),
-                "Profit Margin": safe_to_float(data.get("Profit Margin", np.nan)),
+                "P/E Ratio": data_num.get("P/E Ratio", np.nan),
+                "ROE": data_num.get("ROE", np.nan),
+                "Debt-to-Equity": data_num.get("Debt-to-Equity", np.nan),
+                "Profit Margin": data_num.get("Profit Margin", np.nan),
             })
         except Exception as e:
             print(f"Failed to process fundamentals for {ticker}: {e}")
@@ -67,7 +53,7 @@ def compare_companies(resolved_symbols):
     # 📊 Unified Modular 2x2 Comparative Layout
     # =====================================================
     metrics_to_plot = ["P/E Ratio", "ROE", "Debt-to-Equity", "Profit Margin"]
-    fig, axes = plt.subplots(2, 2, figsize=(11, 6))
+    fig, axes = plt.subplots(2, 2, figsize=(11, 6), layout="constrained")
     axes = axes.flatten()
 
     # --- THEME COLORS (SLATE & SAPPHIRE) ---
@@ -100,8 +86,6 @@ def compare_companies(resolved_symbols):
             ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(),
                     f"{val:.2f}", ha="center", va="bottom", color="white", fontsize=8)
 
-    plt.tight_layout(pad=2.0)
-
     # =====================================================
     # 💡 AI Comparative Insight
     # =====================================================
@@ -1,11 +1,24 @@
 import streamlit as st # Import Streamlit for caching
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from GoogleNews import GoogleNews
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 # NOTE: The get_ticker_from_name function has been moved to ticker_resolver.py
 
+# One keep-alive session for the plain HTTP fetches, so repeated cache misses
+# reuse the open connection instead of paying a new TLS handshake each time.
+# (yfinance manages its own curl_cffi session and does not accept this one.)
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+_HTTP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=20, pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.2),
+))
+
 # ------------------------------------------------------------
 # ✅ STOCK DATA FETCH
 # ------------------------------------------------------------
@@ -15,6 +28,37 @@ def resolve_ticker(query: str) -> str:
     return query.strip().upper()
 
 
+@st.cache_data(ttl=900) # Cache per (ticker, period, interval) for 15 minutes
+def _cached_price_history(ticker: str, period: str, interval: str) -> pd.DataFrame:
+    """
+    Cached body of get_price_history. Failures and empty results raise, so
+    st.cache_data keeps neither and the next call asks Yahoo again.
+    """
+    t = yf.Ticker(ticker)
+    hist = t.history(period=period, interval=interval)
+
+    if hist.empty:
+        raise LookupError(f"no price history for {ticker}")
+
+    # Ensure DatetimeIndex
+    hist.reset_index(inplace=True)
+    hist['Date'] = pd.to_datetime(hist['Date']).dt.strftime('%Y-%m-%d')
+    hist.set_index('Date', inplace=True)
+
+    # Keep relevant numeric columns
+    numeric_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
+    
+    cols_to_use = [col for col in numeric_cols if col in hist.columns]
+    hist = hist[cols_to_use]
+
+    # Remove duplicates & ensure numeric
+    hist = hist.apply(pd.to_numeric, errors='coerce').dropna()
+    if hist.empty:
+        raise LookupError(f"no numeric price history for {ticker}")
+
+    return hist
+
+
 def get_price_history(ticker: str, period: str = "24mo", interval: str = "1d") -> pd.DataFrame:
     """
     Fetch and clean historical stock price data using yfinance.
@@ -25,28 +69,9 @@ def get_price_history(ticker: str, period: str = "24mo", interval: str = "1d") -
         Clean DataFrame with DatetimeIndex and numeric columns.
     """
     try:
-        t = yf.Ticker(ticker)
-        hist = t.history(period=period, interval=interval)
-
-        if hist.empty:
-            return pd.DataFrame()
-
-        # Ensure DatetimeIndex
-        hist.reset_index(inplace=True)
-        hist['Date'] = pd.to_datetime(hist['Date']).dt.strftime('%Y-%m-%d')
-        hist.set_index('Date', inplace=True)
-
-        # Keep relevant numeric columns
-        numeric_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-        
-        cols_to_use = [col for col in numeric_cols if col in hist.columns]
-        hist = hist[cols_to_use]
-
-        # Remove duplicates & ensure numeric
-        hist = hist.apply(pd.to_numeric, errors='coerce').dropna()
-
-        return hist
-
+        return _cached_price_history(ticker, period, interval)
+    except LookupError:
+        return pd.DataFrame()
     except Exception as e:
         print(f"Error in get_price_history: {e}")
         return pd.DataFrame()
@@ -73,6 +98,25 @@ def get_financials(ticker: str):
 # ✅ NEWS HEADLINES FETCH (MODIFIED)
 # ------------------------------------------------------------
 
+def _clean_headlines(raw: list) -> list:
+    """
+    Turns (title, link) pairs into headline dicts, dropping empty, URL-like,
+    truncated ("...") or very short titles and repeated titles.
+    """
+    if not raw:
+        return []
+    df = pd.DataFrame(raw, columns=["title", "link"])
+    titles = df["title"].fillna("").astype(str).str.strip()
+    links = df["link"].fillna("#").astype(str).str.strip()
+    keep = (
+        titles.str.len().ge(5)
+        & ~titles.str.match("http", case=False)
+        & ~titles.str.contains("...", regex=False)
+        & ~titles.duplicated()
+    )
+    return [{"title": t, "link": l} for t, l in zip(titles[keep], links[keep])]
+
+
 @st.cache_data(ttl=900) # --- MODIFICATION: Cache news for 15 minutes ---
 def get_headlines(topic: str = None, limit: int = 20):
     """
@@ -90,29 +134,8 @@ def get_headlines(topic: str = None, limit: int = 20):
         results = gn.result()[:limit]
 
         if results:
-            for item in results:
-                title = item.get("title", "").strip()
-                link = item.get("link", "#").strip()
-
-                if (
-                    not title
-                    or title.lower().startswith("http")
-                    or "..." in title
-                    or len(title) < 5
-                ):
-                    continue
-
-                headlines.append({"title": title, "link": link})
-
-            # ✅ Remove duplicates safely
-            unique_titles = set()
-            clean_headlines = []
-            for h in headlines:
-                if h["title"] not in unique_titles:
-                    unique_titles.add(h["title"])
-                    clean_headlines.append(h)
-
-            return clean_headlines
+            headlines.extend((item.get("title", ""), item.get("link", "#")) for item in results)
+            return _clean_headlines(headlines)
         else:
             pass # Continue to fallback
     except Exception as e:
@@ -122,34 +145,14 @@ def get_headlines(topic: str = None, limit: int = 20):
     try:
         topic_query = topic.replace(" ", "+") if topic else "Business"
         topic_url = f"https://news.google.com/rss/search?q={topic_query}"
-        response = requests.get(topic_url, timeout=10)
+        response = _HTTP_SESSION.get(topic_url, timeout=10)
 
         if response.status_code == 200:
             soup = BeautifulSoup(response.content, "xml")
             items = soup.find_all("item")
-            for item in items[:limit]:
-                title = item.title.text.strip()
-                link = item.link.text.strip()
-
-                if (
-                    not title
-                    or title.lower().startswith("http")
-                    or "..." in title
-                    or len(title) < 5
-                ):
-                    continue
-
-                headlines.append({"title": title, "link": link})
-
-            # Remove duplicates again (in case of overlap)
-            unique_titles = set()
-            clean_headlines = []
-            for h in headlines:
-                if h["title"] not in unique_titles:
-                    unique_titles.add(h["title"])
-                    clean_headlines.append(h)
-
-            return clean_headlines
+            headlines.extend((item.title.text, item.link.text) for item in items[:limit])
+            # Also removes overlap with anything the primary source returned
+            return _clean_headlines(headlines)
         else:
             pass
     except Exception as e:
@@ -184,54 +187,45 @@ def get_market_data(tickers: list):
     - Global markets are closed on weekends (Saturday/Sunday)
     - This function fetches 10 days of historical data
     - On weekends, it automatically shows the most recent trading day's data (typically Friday)
-    - The dropna() operation ensures we skip weekend gaps and find the last valid trading session
+    - NaN gaps are skipped, so each ticker uses its last two valid trading sessions
     """
     try:
         # Download 10 days to handle market closures and weekends
         # This ensures weekend requests get Friday's data
-        data = yf.download(tickers, period="10d", interval="1d", auto_adjust=True, progress=False)
-        if data.empty:
+        data = yf.download(tickers, period="10d", interval="1d", auto_adjust=True,
+                           progress=False)
+        # A failed or empty download has no 'Close' column to select
+        if data is None or data.empty or 'Close' not in data:
             return {}
-            
         close_data = data['Close']
+
         if len(close_data) < 2:
             return {} 
         
-        market_data = {}
-        
-        # Handle multiple tickers
-        if isinstance(close_data, pd.DataFrame):
-            for ticker in tickers:
-                if ticker not in close_data.columns:
-                    continue
-                    
-                # Get the ticker's price series and drop NaN values
-                ticker_prices = close_data[ticker].dropna()
-                
-                if len(ticker_prices) >= 2:
-                    latest_price = ticker_prices.iloc[-1]
-                    prev_price = ticker_prices.iloc[-2]
-                    pct_change = ((latest_price - prev_price) / prev_price) * 100
-                    
-                    market_data[ticker] = {
-                        "price": latest_price,
-                        "change": pct_change
-                    }
-        # Handle single ticker
-        else:
-            ticker_prices = close_data.dropna()
-            if len(ticker_prices) >= 2:
-                ticker = tickers[0]
-                latest_price = ticker_prices.iloc[-1]
-                prev_price = ticker_prices.iloc[-2]
-                pct_change = ((latest_price - prev_price) / prev_price) * 100
-                
-                market_data[ticker] = {
-                    "price": latest_price,
-                    "change": pct_change
-                }
-
-        return market_data
+        # A single ticker comes back as a Series
+        if not isinstance(close_data, pd.DataFrame):
+            close_data = close_data.to_frame(tickers[0])
+        close_data = close_data.reindex(columns=[t for t in tickers if t in close_data.columns])
+
+        # Last and second-to-last valid price per ticker, found on the whole
+        # array at once: the row of the last True in each column of `valid`
+        prices = close_data.to_numpy(dtype=np.float64)
+        valid = ~np.isnan(prices)
+        enough = valid.sum(axis=0) >= 2
+        cols = np.arange(prices.shape[1])
+        last = len(prices) - 1 - valid[::-1].argmax(axis=0)
+        valid[last, cols] = False
+        prev = len(prices) - 1 - valid[::-1].argmax(axis=0)
+
+        latest_price = prices[last, cols]
+        prev_price = prices[prev, cols]
+        pct_change = ((latest_price - prev_price) / prev_price) * 100
+
+        return {
+            ticker: {"price": price, "change": change}
+            for ticker, price, change, keep in zip(close_data.columns, latest_price, pct_change, enough)
+            if keep
+        }
     except Exception as e:
         print(f"Error in get_market_data: {e}")
         import traceback
@@ -1,6 +1,11 @@
+import os
+import re
+import pickle
 import numpy as np
 import pandas as pd
-import yfinance as yf
+from modules._yf_cache import cached_history, cached_info
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import warnings
 warnings.filterwarnings("ignore")
@@ -10,6 +15,17 @@ try:
 except Exception:
     Prophet = None
 
+try:
+    from numba import njit, prange
+except Exception:
+    njit = None
+
+# Above this many paths the fused numba kernel beats the NumPy version
+NUMBA_MIN_SIMULATIONS = 1000
+
+# Fitted Prophet models, keyed by ticker / last date / flexibility
+PROPHET_CACHE_DIR = ".prophet_cache"
+
 # ---------------------------------------------------
 # Data Prep
 # ---------------------------------------------------
@@ -18,27 +34,20 @@ def _prepare_data(ticker: str, period: str = "3y"):
     Downloads data and renames columns for Prophet.
     Returns a DataFrame with ['ds', 'y']
     """
-    df = yf.download(ticker, period=period, interval="1d", progress=False)
+    df = cached_history(ticker, period=period)
     if df.empty:
         raise ValueError(f"No data found for {ticker} in period {period}")
         
     df = df.reset_index()
     df.columns = [str(col).lower() for col in df.columns]
 
-    date_col = 'date'
-    if 'date' not in df.columns:
-        if 'index' in df.columns: date_col = 'index'
-        elif 'datetime' in df.columns: date_col = 'datetime'
-        else: date_col = df.columns[0] 
-
-    price_col = 'adj close' # Use Adj Close for accuracy
-    if 'adj close' not in df.columns:
-        if 'close' in df.columns: price_col = 'close'
-        else:
-            for col in df.columns:
-                if 'close' in col:
-                    price_col = col
-                    break
+    cols = set(df.columns)
+    date_col = next((c for c in ("date", "index", "datetime") if c in cols), df.columns[0])
+
+    # Use Adj Close for accuracy
+    price_col = next((c for c in ("adj close", "close") if c in cols), None)
+    if price_col is None:
+        price_col = next((c for c in df.columns if 'close' in c), None)
     
     if price_col is None:
         raise ValueError("Could not find 'Close' or 'Adj Close' column in data.")
@@ -49,7 +58,7 @@ def _prepare_data(ticker: str, period: str = "3y"):
     return df
 
 # ---------------------------------------------------
-# Generate Forecast (Prophet + Monte Carlo)
+# Generate Forecast (Trend + Monte Carlo)
 # ---------------------------------------------------
 
 def calculate_garch_volatility(returns: pd.Series, forecast_days: int = 30) -> np.ndarray:
@@ -101,9 +110,174 @@ def calculate_garch_volatility(returns: pd.Series, forecast_days: int = 30) -> n
     return forecast_vols
 
 
-def generate_forecast(ticker: str, period=90, num_simulations=100):
+def fit_trend(hist_df: pd.DataFrame, period: int, flexibility: float = 0.05,
+              n_changepoints: int = 25, fourier_order: int = 6):
+    """
+    Fits a piecewise-linear trend with yearly Fourier seasonality by least
+    squares and extrapolates it ``period`` days ahead.
+    
+    This reproduces the part of Prophet the forecast actually uses (trend +
+    yearly seasonality) without the Stan compile and optimisation step.
+    Slope changes get a ridge penalty derived from ``flexibility``, which
+    plays the role of Prophet's ``changepoint_prior_scale``.
+    
+    Parameters
+    ----------
+    hist_df : pd.DataFrame
+        History with 'ds' (dates) and 'y' (prices) columns
+    period : int
+        Number of calendar days to extrapolate
+    flexibility : float
+        Prior scale of the slope changes (higher = more flexible trend)
+    n_changepoints : int
+        Number of potential changepoints in the first 80% of history
+    fourier_order : int
+        Number of yearly Fourier harmonics
+        
+    Returns
+    -------
+    Tuple[pd.Series, np.ndarray]
+        Future dates and the fitted values (yhat) at those dates
+    """
+    ds = pd.to_datetime(hist_df['ds'])
+    y = hist_df['y'].to_numpy(dtype=np.float64)
+    t0 = ds.iloc[0]
+    t = (ds - t0).dt.days.to_numpy(dtype=np.float64)
+    span = t[-1] if t[-1] > 0 else 1.0
+    y_scale = np.abs(y).max() or 1.0
+
+    future_dates = pd.Series(pd.date_range(ds.iloc[-1] + pd.Timedelta(days=1), periods=period, freq="D"))
+    t_future = (future_dates - t0).dt.days.to_numpy(dtype=np.float64)
+
+    changepoints = np.linspace(0, 0.8, n_changepoints + 1)[1:]
+    harmonics = np.arange(1, fourier_order + 1)
+
+    def design(days):
+        ts = days / span
+        w = 2 * np.pi * np.outer(days, harmonics) / 365.25
+        return np.column_stack([
+            np.ones_like(ts), ts,
+            np.maximum(0.0, ts[:, None] - changepoints),
+            np.sin(w), np.cos(w),
+        ])
+
+    X = design(t)
+    ys = y / y_scale
+    hinge = np.zeros(X.shape[1], dtype=bool)
+    hinge[2:2 + n_changepoints] = True
+
+    # Noise level from a fit without slope changes, then a ridge (Gaussian
+    # prior) on the changepoint deltas: lambda = sigma^2 / tau^2
+    beta_base = np.linalg.lstsq(X[:, ~hinge], ys, rcond=None)[0]
+    sigma2 = np.mean((ys - X[:, ~hinge] @ beta_base) ** 2)
+    penalty = np.sqrt(sigma2) / max(flexibility, 1e-6)
+    X_aug = np.vstack([X, penalty * np.eye(X.shape[1])[hinge]])
+    y_aug = np.concatenate([ys, np.zeros(n_changepoints)])
+    beta = np.linalg.lstsq(X_aug, y_aug, rcond=None)[0]
+
+    yhat = design(t_future) @ beta * y_scale
+    return future_dates, yhat
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _simulate_paths_numba(last_price, drift, scale, df_t, num_simulations):
+        # One path per prange iteration: shock draw, drift and compounding
+        # are fused, so no (period, num_simulations) temporaries are built.
+        steps = len(drift)
+        out = np.empty((num_simulations, steps + 1), dtype=np.float32)
+        for j in prange(num_simulations):
+            p = last_price
+            out[j, 0] = p
+            for d in range(steps):
+                p *= 1.0 + drift[d] + scale[d] * np.random.standard_t(df_t)
+                out[j, d + 1] = p
+        return out
+
+
+def simulate_paths(last_price, drift, volatilities, period, num_simulations, df_t=6):
+    """
+    Simulates price paths with a deterministic drift and student-t shocks
+    scaled by a (time-varying) volatility.
+    
+    Parameters
+    ----------
+    last_price : float
+        Starting price of every path
+    drift : np.ndarray
+        Daily drift; missing days are treated as 0
+    volatilities : np.ndarray
+        Daily volatility; missing days reuse the last value
+    period : int
+        Number of points per path (including the starting price)
+    num_simulations : int
+        Number of paths
+    df_t : int
+        Degrees of freedom for student-t (lower = fatter tails)
+        
+    Returns
+    -------
+    np.ndarray
+        float32 array of shape (period, num_simulations)
+    """
+    steps = max(period - 1, 0)
+    drift_steps = np.zeros(steps, dtype=np.float32)
+    drift_steps[:min(steps, len(drift))] = drift[:steps]
+    vol_steps = np.full(steps, volatilities[-1], dtype=np.float32)
+    vol_steps[:min(steps, len(volatilities))] = volatilities[:steps]
+    
+    # Rescale so the shocks have the target standard deviation
+    scale = vol_steps / np.float32(np.sqrt(df_t / (df_t - 2)))
+    
+    if njit is not None and num_simulations >= NUMBA_MIN_SIMULATIONS:
+        return _simulate_paths_numba(float(last_price), drift_steps, scale, df_t, num_simulations).T
+    
+    shocks = np.random.standard_t(df_t, size=(steps, num_simulations)).astype(np.float32)
+    growth = 1 + drift_steps[:, None] + shocks * scale[:, None]
+    
+    simulations = np.empty((period, num_simulations), dtype=np.float32)
+    simulations[0] = last_price
+    np.cumprod(growth, axis=0, out=simulations[1:])
+    simulations[1:] *= np.float32(last_price)
+    return simulations
+
+
+def _fit_prophet(ticker: str, hist_df: pd.DataFrame, flexibility: float):
+    """
+    Fits Prophet on hist_df, reusing a pickled model when one was already
+    fitted for the same ticker, last date and flexibility.
     """
-    Runs an enhanced Prophet forecast with GARCH volatility and uses
+    last_date = hist_df['ds'].max()
+    safe_ticker = re.sub(r"[^\w.=^-]", "_", ticker)
+    cache_path = os.path.join(PROPHET_CACHE_DIR, f"{safe_ticker}_{last_date:%Y%m%d}_{flexibility}.pkl")
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass  # Corrupt/incompatible cache entry: refit below
+
+    model = Prophet(
+        daily_seasonality=True, 
+        weekly_seasonality=False, 
+        yearly_seasonality=True,
+        changepoint_prior_scale=flexibility
+    )
+    model.fit(hist_df)
+
+    try:
+        os.makedirs(PROPHET_CACHE_DIR, exist_ok=True)
+        with open(cache_path, "wb") as f:
+            pickle.dump(model, f)
+    except Exception:
+        pass  # Caching is best-effort
+    return model
+
+
+def generate_forecast(ticker: str, period=90, num_simulations=100, use_prophet=False):
+    """
+    Runs an enhanced trend forecast with GARCH volatility and uses
     student-t distribution for better fat-tail modeling.
     
     Improvements over original:
@@ -111,69 +285,54 @@ def generate_forecast(ticker: str, period=90, num_simulations=100):
     - 200 simulations instead of 100
     - GARCH volatility instead of constant
     - Student-t distribution for shocks
+    - Least-squares trend (fit_trend) instead of Prophet, unless
+      use_prophet=True
     """
-    if Prophet is None:
+    if use_prophet and Prophet is None:
         raise ImportError("Prophet library not found. Please run 'pip install prophet'.")
 
     # 1. Get Historical Data (INCREASED TO 5 YEARS)
     hist_df = _prepare_data(ticker, period="5y")
     last_actual_date = hist_df['ds'].max()
     
-    # 2. Get Prophet Trend (the "Drift")
-    info = yf.Ticker(ticker).info
-    beta = info.get("beta", 1.0)
+    # 2. Get Trend (the "Drift")
+    beta = cached_info(ticker).get("beta", 1.0)
     flexibility = 0.25 if (beta or 1.0) > 1.2 else 0.01 if (beta or 1.0) < 0.8 else 0.05
     
-    model = Prophet(
-        daily_seasonality=True, 
-        weekly_seasonality=False, 
-        yearly_seasonality=True,
-        changepoint_prior_scale=flexibility
-    )
-    model.fit(hist_df)
-    future = model.make_future_dataframe(periods=period)
-    forecast_df = model.predict(future)
+    if use_prophet:
+        model = _fit_prophet(ticker, hist_df, flexibility)
+        future = model.make_future_dataframe(periods=period)
+        forecast_df = model.predict(future)
+        forecast_part = forecast_df[forecast_df['ds'] > last_actual_date]
+        future_dates = forecast_part['ds'][:period]
+        yhat = forecast_part['yhat'].to_numpy()
+    else:
+        future_dates, yhat = fit_trend(hist_df, period, flexibility)
     
     # 3. Calculate GARCH-based Volatility (ENHANCED)
-    hist_df['log_return'] = np.log(hist_df['y'] / hist_df['y'].shift(1))
+    y = hist_df['y'].to_numpy(dtype=np.float64)
+    log_returns = np.log(y[1:] / y[:-1])
+    hist_df['log_return'] = np.concatenate(([np.nan], log_returns))
     
     # Use GARCH for dynamic volatility
-    forecast_volatilities = calculate_garch_volatility(hist_df['log_return'], forecast_days=period)
+    # The simulation only needs a few significant digits, so everything that
+    # feeds it is kept in float32 to halve the memory traffic.
+    forecast_volatilities = calculate_garch_volatility(hist_df['log_return'], forecast_days=period).astype(np.float32)
     
     # Fallback to constant volatility if GARCH fails
     if len(forecast_volatilities) == 0:
-        base_volatility = hist_df['log_return'].std()
-        forecast_volatilities = np.full(period, base_volatility)
+        base_volatility = log_returns.std(ddof=1)
+        forecast_volatilities = np.full(period, base_volatility, dtype=np.float32)
     
     # 4. Run Enhanced Monte Carlo Simulation (200 SIMULATIONS)
     last_price = hist_df['y'].iloc[-1]
-    simulations = np.zeros((period, num_simulations))
-    
-    # Get the forecasted part of the trend
-    forecast_part = forecast_df[forecast_df['ds'] > last_actual_date]
-    prophet_trend = forecast_part['yhat'].pct_change().fillna(0).values
-    
-    # Degrees of freedom for student-t (lower = fatter tails)
-    df_t = 6  # Captures fat tails better than normal distribution
-    
-    for i in range(num_simulations):
-        prices = [last_price]
-        for day in range(period - 1):
-            drift = prophet_trend[day] if day < len(prophet_trend) else 0
-            
-            # Use time-varying GARCH volatility
-            vol = forecast_volatilities[day] if day < len(forecast_volatilities) else forecast_volatilities[-1]
-            
-            # Use student-t distribution for better fat-tail modeling
-            random_shock = np.random.standard_t(df_t) * vol / np.sqrt(df_t / (df_t - 2))
-            
-            next_price = prices[-1] * (1 + drift + random_shock)
-            prices.append(next_price)
-        simulations[:, i] = prices
-        
-    # Get dates for the forecast
-    future_dates = forecast_part['ds'][:period]
     
+    # Daily drift implied by the forecasted trend
+    trend_drift = np.zeros(len(yhat), dtype=np.float32)
+    trend_drift[1:] = yhat[1:] / yhat[:-1] - 1
+    
+    simulations = simulate_paths(last_price, trend_drift, forecast_volatilities, period, num_simulations)
+        
     return hist_df, simulations, future_dates
 
 
@@ -185,7 +344,7 @@ def plot_forecast(hist_df, simulations, future_dates, sentiment_score=0.0):
     Plots the Monte Carlo simulation with a 90% confidence interval
     and a sentiment-adjusted line.
     """
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig, ax = plt.subplots(figsize=(10, 5), layout="constrained")
     
     # --- THEME COLORS (SLATE & SAPPHIRE) ---
     BG_COLOR = "#121A2A"
@@ -198,9 +357,8 @@ def plot_forecast(hist_df, simulations, future_dates, sentiment_score=0.0):
     ax.plot(future_dates, simulations, color=ACCENT_COLOR, alpha=0.1, linewidth=1)
     
     # 2. Calculate percentiles and ensemble
-    percentile_5 = np.percentile(simulations, 5, axis=1)
-    percentile_50 = np.percentile(simulations, 50, axis=1) # The Median
-    percentile_95 = np.percentile(simulations, 95, axis=1)
+    # One partition pass per row for all three bands (5th, median, 95th)
+    percentile_5, percentile_50, percentile_95 = np.percentile(simulations, [5, 50, 95], axis=1)
     
     # 3. Create Sentiment-Adjusted Line
     last_price = hist_df['y'].iloc[-1]
@@ -232,6 +390,4 @@ def plot_forecast(hist_df, simulations, future_dates, sentiment_score=0.0):
     ax.legend(facecolor=BG_COLOR, labelcolor=TEXT_COLOR, loc="upper left")
     ax.set_title("Monte Carlo Forecast (100 Simulations)", color=TEXT_COLOR, fontsize=14)
     ax.grid(True, color=BORDER_COLOR, alpha=0.5, linestyle="--")
-    
-    plt.tight_layout()
     return fig
\ No newline at end of file
@@ -1,7 +1,57 @@
+import re
+import time
+import threading
 import yfinance as yf
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from functools import lru_cache
+from modules._yf_cache import cached_info
+
+_NONWORD = re.compile(r"\W+")
+
+# Line items, matched against the normalised statement row labels. The charted
+# rows are exact labels; the rest only feed the _ratios fallbacks.
+_ROW_PATTERNS = {
+    "revenue": r"^totalrevenue$",
+    "net_income": r"^netincome$",
+    "operating_cash_flow": r"^totalcashfromoperatingactivities$",
+    "equity": r"stockholdersequity|shareholdersequity",
+    "assets": r"^totalassets$",
+    "total_debt": r"^totaldebt$",
+}
+
+# Yahoo data is reused for this many seconds before it is fetched again
+_CACHE_TTL = 900
+_TICKER_CACHE_SIZE = 256
+_TICKER_CACHE: OrderedDict = OrderedDict()
+_TICKER_LOCK = threading.Lock()
+
+# info fields read by get_fundamentals, in the order they are unpacked there
+_INFO_KEYS = (
+    "currency", "currentPrice", "regularMarketPrice", "previousClose",
+    "dividendYield", "trailingAnnualDividendRate", "trailingEps", "payoutRatio",
+    "returnOnEquity", "returnOnAssets", "debtToEquity", "marketCap", "totalRevenue",
+    "profitMargins", "trailingPE", "forwardPE", "pegRatio", "beta",
+)
+
+# Plotted chart values keyed by ticker and statement contents, least recently used first
+_FIG_CACHE_SIZE = 64
+_FIG_CACHE: OrderedDict = OrderedDict()
+_FIG_LOCK = threading.Lock()  # shared by Streamlit session threads and the batch pool
+
+# --- THEME COLORS (SLATE & SAPPHIRE) ---
+_CHART_STYLE = {
+    "bg": "#121A2A",          # Dark Panel Blue
+    "text": "#FFFFFF",
+    "accent": "#0D6EFD",      # Sapphire Blue
+    "accent_alt": "#00FFFF",  # Cyan
+    "border": "#30363D",
+}
 
 # =========================================================
 # 🔹 Helper Functions
@@ -35,36 +85,283 @@ def _format_ratio(num, is_percent=False):
     except (ValueError, TypeError):
         return "N/A"
 
+def _row_index(df):
+    """Maps each _ROW_PATTERNS key to its matching rows; built once per frame."""
+    index = df.attrs.get("row_index")
+    if index is None:
+        labels = df.index
+        index = {key: list(labels[labels.str.contains(pat, regex=True)])
+                 for key, pat in _ROW_PATTERNS.items()}
+        df.attrs["row_index"] = index
+    return index
+
+def _find_row(df, key):
+    """First row label of df matching the given _ROW_PATTERNS key, or None."""
+    if df.empty:
+        return None
+    matches = _row_index(df)[key]
+    return matches[0] if matches else None
+
+def _latest_values(df, *keys):
+    """Latest-period value for each _ROW_PATTERNS key (NaN when absent)."""
+    if df.empty:
+        return [np.nan] * len(keys)
+    # One array for the newest column; every key is a positional read from it
+    latest = df.iloc[:, 0].to_numpy(dtype=np.float64, na_value=np.nan)
+    rows = [_find_row(df, key) for key in keys]
+    return [latest[df.index.get_loc(row)] if row else np.nan for row in rows]
+
+def _statement_record(fin, bs):
+    """
+    Latest-period net income, equity, assets and total debt as one flat
+    float64 array (NaN when absent). Records from several tickers stack into
+    an (N, 4) array that _ratios consumes column-wise.
+    """
+    net_income, = _latest_values(fin, "net_income")
+    return np.array([net_income, *_latest_values(bs, "equity", "assets", "total_debt")],
+                    dtype=np.float64)
+
+def _ratios(net_income, equity, assets, total_debt, info_roe, info_roa, info_de):
+    """
+    NaN-aware ROE, ROA and D/E in Yahoo's units: ROE and ROA as fractions
+    (0.25 is 25%, scaled by _format_ratio(is_percent=True)), D/E already in
+    percent. Yahoo's values win; the statement-derived ratios only fill
+    gaps, and a missing or zero denominator leaves NaN. Takes scalars or
+    aligned arrays, so a whole batch of tickers is a single call.
+    """
+    net_income, equity, assets, total_debt, info_roe, info_roa, info_de = (
+        np.asarray(x, dtype=np.float64)  # None -> NaN
+        for x in (net_income, equity, assets, total_debt, info_roe, info_roa, info_de)
+    )
+    valid_equity = np.isfinite(equity) & (equity != 0)
+    valid_assets = np.isfinite(assets) & (assets != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roe = np.where(np.isnan(info_roe) & valid_equity, net_income / equity, info_roe)
+        roa = np.where(np.isnan(info_roa) & valid_assets, net_income / assets, info_roa)
+        de = np.where(np.isnan(info_de) & valid_equity, total_debt / equity * 100, info_de)
+    return roe, roa, de
+
+def _as_float(value, scale=1.0):
+    """value * scale as a float, or NaN when value is missing or not numeric."""
+    try:
+        return float(value) * scale if value is not None else np.nan
+    except (ValueError, TypeError):
+        return np.nan
+
+def _mark_derived(text, info_value, value):
+    """Suffixes a formatted ratio that was derived from the statements because Yahoo had none."""
+    if np.isnan(_as_float(info_value)) and np.isfinite(value):
+        return f"{text} (from statements)"
+    return text
+
+def _ttl_bucket():
+    """Index of the current cache window; changes every _CACHE_TTL seconds."""
+    return int(time.time() // _CACHE_TTL)
+
+def get_ticker(ticker_symbol: str) -> yf.Ticker:
+    """
+    Returns a shared yf.Ticker for the symbol. yfinance memoizes .info on the
+    object, so modules sharing it avoid refetching. The handle is rebuilt
+    once per cache window so prices do not go stale.
+    """
+    bucket = _ttl_bucket()
+    with _TICKER_LOCK:
+        cached = _TICKER_CACHE.get(ticker_symbol)
+        if cached is None or cached[0] != bucket:
+            cached = (bucket, yf.Ticker(ticker_symbol))
+            _TICKER_CACHE[ticker_symbol] = cached
+        _TICKER_CACHE.move_to_end(ticker_symbol)
+        if len(_TICKER_CACHE) > _TICKER_CACHE_SIZE:
+            _TICKER_CACHE.popitem(last=False)
+    return cached[1]
+
+@lru_cache(maxsize=256)
+def _fetch_statements(ticker_symbol: str, bucket: int):
+    t = get_ticker(ticker_symbol)
+    # Each attribute is a separate HTTP round-trip; issue them concurrently
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        info_f = ex.submit(cached_info, ticker_symbol)
+        fin_f = ex.submit(lambda: t.financials)
+        bs_f = ex.submit(lambda: t.balance_sheet)
+        cf_f = ex.submit(lambda: t.cashflow)
+        info, fin, bs, cf = info_f.result(), fin_f.result(), bs_f.result(), cf_f.result()
+    # Plain dict snapshot so lookups in get_fundamentals are simple hash hits
+    return dict(info or {}), fin, bs, cf
+
+def _get_statements(ticker_symbol: str):
+    """Returns (info, financials, balance_sheet, cashflow), cached per window."""
+    return _fetch_statements(ticker_symbol, _ttl_bucket())
+
+def _themed_figure(figsize):
+    """New standalone Figure with one Axes, styled with _CHART_STYLE."""
+    fig = Figure(figsize=figsize, layout="constrained")
+    fig.patch.set_facecolor(_CHART_STYLE["bg"])
+    ax = fig.subplots()
+    ax.set_facecolor(_CHART_STYLE["bg"])
+    ax.tick_params(colors=_CHART_STYLE["text"])
+    for spine in ax.spines.values():
+        spine.set_color(_CHART_STYLE["border"])
+    return fig, ax
+
+def _frozen(values):
+    """Read-only float64 copy, safe to share between callers of the chart cache."""
+    arr = np.array(values, dtype=np.float64)
+    arr.flags.writeable = False
+    return arr
+
+def _chart_data(fin, cf, info):
+    """
+    Extracts the values plotted by _draw_figures as read-only arrays, keyed
+    like the figs dict. Charts whose line items are missing are left out.
+    """
+    data = {}
+
+    # Statements are line items x periods, most recent period first
+    revenue_row = _find_row(fin, "revenue")
+    net_income_row = _find_row(fin, "net_income")
+    ocf_row = _find_row(cf, "operating_cash_flow")
+
+    # 1️⃣ Revenue vs Net Income
+    try:
+        if revenue_row and net_income_row:
+            data["rev_income"] = (tuple(fin.columns),
+                                  _frozen(fin.loc[revenue_row].to_numpy(dtype=np.float64, na_value=0.0) * 1e-9),
+                                  _frozen(fin.loc[net_income_row].to_numpy(dtype=np.float64, na_value=0.0) * 1e-9))
+    except Exception:
+        pass
+
+    # 2️⃣ Operating Cash Flow
+    try:
+        if ocf_row:
+            data["cash_flow"] = (tuple(cf.columns),
+                                 _frozen(cf.loc[ocf_row].to_numpy(dtype=np.float64, na_value=0.0) * 1e-9))
+    except Exception:
+        pass
+
+    # 3️⃣ Balance Sheet Snapshot (always draw something)
+    try:
+        equity = info.get("totalStockholderEquity", 0)
+        assets = info.get("totalAssets", 0)
+        liab = info.get("totalLiab", 0)
+
+        if assets > 0 and liab > 0 and equity > 0:
+            data["balance_sheet"] = _frozen(np.array([assets, liab, equity], dtype=np.float64) * 1e-9)
+    except Exception as e:
+        pass
+    return data
+
+def _draw_figures(ticker_symbol, currency_symbol, data):
+    """
+    Draws the revenue, cash flow and balance sheet charts from _chart_data.
+    Figures are built directly rather than through pyplot, so they are never
+    registered with its figure manager; every call returns new Figures that
+    the caller owns.
+    """
+    figs = {}
+    BG_COLOR = _CHART_STYLE["bg"]
+    TEXT_COLOR = _CHART_STYLE["text"]
+    ACCENT_COLOR = _CHART_STYLE["accent"]
+    ACCENT_ALT = _CHART_STYLE["accent_alt"]
+
+    try:
+        if "rev_income" in data:
+            periods, revenue, net_income = data["rev_income"]
+            fig1, ax1 = _themed_figure((5, 2.5))
+            ax1.plot(periods, revenue, label=f"Revenue (B{currency_symbol})", color=ACCENT_COLOR, linewidth=2)
+            ax1.plot(periods, net_income, label=f"Net Income (B{currency_symbol})", color=ACCENT_ALT, linewidth=2, linestyle='--')
+            ax1.legend(facecolor=BG_COLOR, labelcolor=TEXT_COLOR, fontsize=7)
+            ax1.set_title(f"{ticker_symbol} Revenue vs Net Income", color=TEXT_COLOR, fontsize=9)
+            ax1.tick_params(rotation=25)
+            figs["rev_income"] = fig1
+    except Exception:
+        pass
+
+    try:
+        if "cash_flow" in data:
+            periods, ocf = data["cash_flow"]
+            fig2, ax2 = _themed_figure((5, 2.5))
+            ax2.bar(periods, ocf, color=ACCENT_COLOR)
+            ax2.set_title(f"{ticker_symbol} Operating Cash Flow (B{currency_symbol})", color=TEXT_COLOR, fontsize=9)
+            ax2.tick_params(rotation=25)
+            figs["cash_flow"] = fig2
+    except Exception:
+        pass
+
+    try:
+        if "balance_sheet" in data:
+            fig3, ax3 = _themed_figure((3.5, 2))
+            ax3.bar(["Assets", "Liabilities", "Equity"], data["balance_sheet"],
+                    color=[ACCENT_COLOR, "#D40000", ACCENT_ALT]) # Blue, Red, Cyan
+            ax3.set_title(f"Balance Sheet (B{currency_symbol})", color=TEXT_COLOR, fontsize=9)
+            figs["balance_sheet"] = fig3
+    except Exception:
+        pass
+    return figs
+
+def _get_figures(ticker_symbol, currency_symbol, fin, cf, info):
+    """
+    Returns freshly drawn charts for these statements. Only the plotted values
+    are cached (keyed by ticker and statement contents); Figures are mutable
+    and not thread-safe, so each caller gets its own.
+    """
+    key = (
+        ticker_symbol,
+        *(int(pd.util.hash_pandas_object(df).sum()) if not df.empty else 0 for df in (fin, cf)),
+        *(info.get(k) for k in ("totalStockholderEquity", "totalAssets", "totalLiab")),
+    )
+    with _FIG_LOCK:
+        data = _FIG_CACHE.get(key)
+        if data is not None:
+            _FIG_CACHE.move_to_end(key)
+    if data is None:
+        data = _chart_data(fin, cf, info)
+        with _FIG_LOCK:
+            _FIG_CACHE[key] = data
+            if len(_FIG_CACHE) > _FIG_CACHE_SIZE:
+                _FIG_CACHE.popitem(last=False)
+    return _draw_figures(ticker_symbol, currency_symbol, data)
+
 # =============================================================
 # ✅ REVISED UNIVERSAL FUNDAMENTALS
 # =============================================================
-def get_fundamentals(ticker_symbol: str):
+def get_fundamentals(ticker_symbol: str, with_figs: bool = True):
     """
     Fetches all financial fundamentals using yfinance, providing robust handling
     for missing data and dynamic currency symbols.
+
+    Pass with_figs=False when only the metrics are needed; the charts are
+    then skipped and figs is returned empty.
+
+    Returns (metrics, figs, profile_info, metrics_num). metrics_num has the
+    same keys as metrics with unformatted floats (NaN when unavailable);
+    percentages are in percent, as displayed.
     """
     try:
-        t = yf.Ticker(ticker_symbol)
-        info = t.info
-        fin = t.financials
-        bs = t.balance_sheet
-        cf = t.cashflow
+        info, fin, bs, cf = _get_statements(ticker_symbol)
 
         def normalize(df):
+            # Kept in yfinance's orientation (line items x periods, newest first);
+            # only the row labels are normalised, on a new frame so the cached
+            # statement is left untouched.
             if df is not None and not df.empty:
-                df = df.transpose().fillna(0)
-                df.columns = df.columns.astype(str).str.lower().str.replace(r'[^\w]', '', regex=True)
-                return df.iloc[::-1]
+                labels = [_NONWORD.sub("", str(c).lower()) for c in df.index]
+                return df.set_axis(labels, axis=0)
             return pd.DataFrame()
 
         fin = normalize(fin)
         bs = normalize(bs)
         cf = normalize(cf)
+        record = _statement_record(fin, bs)
         
+        (currency_code, current_price, market_price, previous_close,
+         dividend_yield_info, trailing_div, trailing_eps, payout_ratio,
+         info_roe, info_roa, info_de, market_cap, total_revenue,
+         profit_margins, trailing_pe, forward_pe, peg_ratio, beta) = map(info.get, _INFO_KEYS)
+
         # =============================================================
         # 🔹 Currency Detection
         # =============================================================
-        currency_code = info.get("currency", "USD")
+        currency_code = currency_code or "USD"
         currency_symbol = "$" # Default
         if currency_code != "USD":
             currency_map = {"INR": "₹", "CAD": "C$", "EUR": "€", "GBP": "£", "JPY": "¥", "AUD": "A$"}
@@ -74,20 +371,16 @@ def get_fundamentals(ticker_symbol: str):
         # =============================================================
         # 🔹 Get Current Price
         # =============================================================
-        current_price = info.get("currentPrice", info.get("regularMarketPrice"))
-        if not current_price or current_price == 0:
-            current_price = info.get("previousClose", 0)
+        current_price = current_price or market_price or previous_close or 0
 
         # =============================================================
         # 🔹 Dividend & Payout
         # =============================================================
-        dividend_yield_info = info.get("dividendYield", 0.0)
-        trailing_div = info.get("trailingAnnualDividendRate", 0)
-        trailing_eps = info.get("trailingEps", 0)
-        payout_ratio = info.get("payoutRatio", 0.0)
+        trailing_div = trailing_div or 0
+        payout_ratio = payout_ratio or 0.0
 
-        div_yield = dividend_yield_info / 100
-        if payout_ratio == 0.0 and trailing_div > 0 and trailing_eps > 0:
+        div_yield = (dividend_yield_info or 0.0) / 100
+        if payout_ratio == 0.0 and trailing_div > 0 and (trailing_eps or 0) > 0:
              payout_ratio = (trailing_div / trailing_eps)
         
         payout_ratio_pct = payout_ratio * 100
@@ -95,26 +388,39 @@ def get_fundamentals(ticker_symbol: str):
         # =============================================================
         # 🔹 Advanced Ratios — D/E, ROE, ROA
         # =============================================================
-        roe = info.get("returnOnEquity")
-        roa = info.get("returnOnAssets")
-        de_ratio = info.get("debtToEquity")
+        roe, roa, de_ratio = (float(r) for r in _ratios(*record, info_roe, info_roa, info_de))
 
         # =============================================================
         # 🔹 Full Metrics Dictionary
         # =============================================================
         metrics = {
             "Current Price": f"{currency_symbol}{_format_ratio(current_price)}",
-            "Market Cap": _format_large_number(info.get('marketCap'), currency_symbol),
-            "Revenue (TTM)": _format_large_number(info.get('totalRevenue'), currency_symbol),
-            "Profit Margin": _format_ratio(info.get('profitMargins'), is_percent=True),
-            "P/E Ratio": _format_ratio(info.get("trailingPE")),
-            "Forward P/E": _format_ratio(info.get("forwardPE")),
-            "PEG Ratio": _format_ratio(info.get("pegRatio")),
-            "EPS": f"{currency_symbol}{_format_ratio(info.get('trailingEps'))}",
-            "Beta": _format_ratio(info.get("beta")),
+            "Market Cap": _format_large_number(market_cap, currency_symbol),
+            "Revenue (TTM)": _format_large_number(total_revenue, currency_symbol),
+            "Profit Margin": _format_ratio(profit_margins, is_percent=True),
+            "P/E Ratio": _format_ratio(trailing_pe),
+            "Forward P/E": _format_ratio(forward_pe),
+            "PEG Ratio": _format_ratio(peg_ratio),
+            "EPS": f"{currency_symbol}{_format_ratio(trailing_eps)}",
+            "Beta": _format_ratio(beta),
             "Dividend Yield": _format_ratio(div_yield, is_percent=True),
-            "ROE": _format_ratio(roe, is_percent=True),
-            "Debt-to-Equity": f"{_format_ratio(de_ratio)}%" 
+            "ROE": _mark_derived(_format_ratio(roe, is_percent=True), info_roe, roe),
+            "Debt-to-Equity": _mark_derived(f"{_format_ratio(de_ratio)}%", info_de, de_ratio),
+        }
+
+        metrics_num = {
+            "Current Price": _as_float(current_price),
+            "Market Cap": _as_float(market_cap),
+            "Revenue (TTM)": _as_float(total_revenue),
+            "Profit Margin": _as_float(profit_margins, 100),
+            "P/E Ratio": _as_float(trailing_pe),
+            "Forward P/E": _as_float(forward_pe),
+            "PEG Ratio": _as_float(peg_ratio),
+            "EPS": _as_float(trailing_eps),
+            "Beta": _as_float(beta),
+            "Dividend Yield": _as_float(div_yield, 100),
+            "ROE": _as_float(roe, 100),
+            "Debt-to-Equity": _as_float(de_ratio),
         }
 
         # =============================================================
@@ -132,73 +438,34 @@ def get_fundamentals(ticker_symbol: str):
         # =============================================================
         # 🔹 Financial Trend Visualizations (3 Graphs)
         # =============================================================
-        figs = {}
-        
-        # --- THEME COLORS (SLATE & SAPPHIRE) ---
-        BG_COLOR = "#121A2A" # Dark Panel Blue
-        TEXT_COLOR = "#FFFFFF"
-        ACCENT_COLOR = "#0D6EFD" # Sapphire Blue
-        ACCENT_ALT = "#00FFFF" # Cyan
-        BORDER_COLOR = "#30363D"
-
-        # 1️⃣ Revenue vs Net Income
-        try:
-            if not fin.empty and "totalrevenue" in fin.columns and "netincome" in fin.columns:
-                fig1, ax1 = plt.subplots(figsize=(5, 2.5))
-                ax1.plot(fin.index, fin["totalrevenue"] / 1e9, label=f"Revenue (B{currency_symbol})", color=ACCENT_COLOR, linewidth=2)
-                ax1.plot(fin.index, fin["netincome"] / 1e9, label=f"Net Income (B{currency_symbol})", color=ACCENT_ALT, linewidth=2, linestyle='--')
-                ax1.legend(facecolor=BG_COLOR, labelcolor=TEXT_COLOR, fontsize=7)
-                ax1.set_facecolor(BG_COLOR)
-                fig1.patch.set_facecolor(BG_COLOR)
-                ax1.set_title(f"{ticker_symbol} Revenue vs Net Income", color=TEXT_COLOR, fontsize=9)
-                ax1.tick_params(colors=TEXT_COLOR, rotation=25)
-                for spine in ax1.spines.values():
-                    spine.set_color(BORDER_COLOR)
-                plt.tight_layout()
-                figs["rev_income"] = fig1
-        except Exception:
-            pass
+        figs = _get_figures(ticker_symbol, currency_symbol, fin, cf, info) if with_figs else {}
 
-        # 2️⃣ Operating Cash Flow
+        return metrics, figs, profile_info, metrics_num
+
+    except Exception as e:
+        return {"Error": f"Failed to fetch data for {ticker_symbol}: {str(e)}"}, {}, {}, {}
+
+
+def get_fundamentals_batch(symbols: list, with_figs: bool = True):
+    """
+    Fetches fundamentals for several symbols. The Yahoo requests for every
+    symbol are issued concurrently first, so the per-symbol work below only
+    reads from the statements cache.
+
+    Returns:
+        dict: {symbol: (metrics, figs, profile_info, metrics_num)}
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+
+    def _prefetch(symbol):
         try:
-            if not cf.empty and "totalcashfromoperatingactivities" in cf.columns:
-                fig2, ax2 = plt.subplots(figsize=(5, 2.5))
-                ax2.bar(cf.index, cf["totalcashfromoperatingactivities"] / 1e9, color=ACCENT_COLOR)
-                ax2.set_facecolor(BG_COLOR)
-                fig2.patch.set_facecolor(BG_COLOR)
-                ax2.set_title(f"{ticker_symbol} Operating Cash Flow (B{currency_symbol})", color=TEXT_COLOR, fontsize=9)
-                ax2.tick_params(colors=TEXT_COLOR, rotation=25)
-                for spine in ax2.spines.values():
-                    spine.set_color(BORDER_COLOR)
-                plt.tight_layout()
-                figs["cash_flow"] = fig2
+            _get_statements(symbol)
         except Exception:
-            pass
+            pass  # get_fundamentals reports the error for this symbol
 
-        # 3️⃣ Balance Sheet Snapshot (always draw something)
-        try:
-            equity = info.get("totalStockholderEquity", 0)
-            assets = info.get("totalAssets", 0)
-            liab = info.get("totalLiab", 0)
-            
-            if assets > 0 and liab > 0 and equity > 0:
-                fig3, ax3 = plt.subplots(figsize=(3.5, 2))
-                ax3.bar(["Assets", "Liabilities", "Equity"], 
-                        [assets / 1e9, liab / 1e9, equity / 1e9],
-                        color=[ACCENT_COLOR, "#D40000", ACCENT_ALT]) # Blue, Red, Cyan
-                ax3.set_facecolor(BG_COLOR)
-                fig3.patch.set_facecolor(BG_COLOR)
-                ax3.set_title(f"Balance Sheet (B{currency_symbol})", color=TEXT_COLOR, fontsize=9)
-                ax3.tick_params(colors=TEXT_COLOR)
-                for spine in ax3.spines.values():
-                    spine.set_color(BORDER_COLOR)
-                plt.tight_layout()
-                figs["balance_sheet"] = fig3
-        except Exception as e:
-            pass
-
-        # --- FIX: Return all 3 items ---
-        return metrics, figs, profile_info
+    with ThreadPoolExecutor(max_workers=min(16, len(symbols))) as ex:
+        list(ex.map(_prefetch, symbols))
 
-    except Exception as e:
-        return {"Error": f"Failed to fetch data for {ticker_symbol}: {str(e)}"}, {}, {}
\ No newline at end of file
+    return {symbol: get_fundamentals(symbol, with_figs=with_figs) for symbol in symbols}
@@ -1,42 +1,25 @@
-import yfinance as yf
 import numpy as np
 import pandas as pd
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from modules import data_fetch
+from modules._yf_cache import cached_info
+from modules.fundamentals import _format_ratio
 
 # =========================================================
-# 🔹 Helper Functions
+# 🔹 AI SUMMARY GENERATOR (v2.2)
 # =========================================================
 
-def _format_large_number(num):
-    """Formats large numbers (e.g., Market Cap) into B/T."""
-    if pd.isna(num) or num == "N/A": return "N/A"
-    try:
-        num = float(num)
-        if abs(num) > 1_000_000_000_000:
-            return f"${num / 1_000_000_000_000:.2f}T"
-        elif abs(num) > 1_000_000_000:
-            return f"${num / 1_000_000_000:.2f}B"
-        elif abs(num) > 1_000_000:
-            return f"${num / 1_000_000:.2f}M"
-        else:
-            return f"${num:,.2f}"
-    except (ValueError, TypeError):
-        return "N/A"
+_SQRT_252 = float(np.sqrt(252))  # trading days per year, for annualising
+_DAYS_6M = 126
+_DAYS_10D = 10
 
-def _format_ratio(num, is_percent=False):
-    """Formats ratios and percentages neatly."""
-    if pd.isna(num) or num == "N/A": return "N/A"
-    try:
-        num = float(num)
-        if is_percent:
-            return f"{num * 100:.2f}%"
-        return f"{num:.2f}"
-    except (ValueError, TypeError):
-        return "N/A"
-
-# =========================================================
-# 🔹 AI SUMMARY GENERATOR (v2.2)
-# =========================================================
+def _fetch_ticker_bundle(ticker: str):
+    """Returns (info, 1y price history), with both requests in flight at once."""
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        info_f = ex.submit(cached_info, ticker)
+        hist_f = ex.submit(data_fetch.get_price_history, ticker, period="1y")
+        return info_f.result(), hist_f.result()
 
 def generate_ai_summary(ticker: str):
     """
@@ -45,11 +28,9 @@ def generate_ai_summary(ticker: str):
     """
     try:
         # --- 1. Data Fetching ---
-        company = yf.Ticker(ticker)
-        info = company.info
+        info, hist = _fetch_ticker_bundle(ticker)
         if not info or 'shortName' not in info:
             return f"⚠️ No company profile data found for **{ticker}**. The symbol may be delisted or invalid."
-        hist = company.history(period="1y")
         if hist.empty:
             return f"⚠️ Could not retrieve price history for **{ticker}**."
 
@@ -67,23 +48,29 @@ def generate_ai_summary(ticker: str):
         beta = _format_ratio(info.get('beta'))
 
         # --- 3. Calculate Market & Technical Data ---
-        current_price = hist['Close'].iloc[-1]
-        
-        hist_6m = hist.tail(126) 
-        price_6m_ago = hist_6m['Close'].iloc[0]
+        close = hist['Close'].to_numpy(dtype=np.float64)
+        current_price = close[-1]
+
+        # Same points as hist.tail(n).iloc[0], read straight off the array
+        price_6m_ago = close[-_DAYS_6M] if close.size >= _DAYS_6M else close[0]
         change_6m_pct = ((current_price / price_6m_ago) - 1) * 100
-        
-        hist_10d = hist.tail(10)
-        price_10d_ago = hist_10d['Close'].iloc[0]
+
+        price_10d_ago = close[-_DAYS_10D] if close.size >= _DAYS_10D else close[0]
         change_10d_pct = ((current_price / price_10d_ago) - 1) * 100
 
-        volatility = _format_ratio(hist_6m['Close'].pct_change().std() * np.sqrt(252), is_percent=True)
-        sma_50 = hist['Close'].rolling(50).mean().iloc[-1]
-        sma_200 = hist['Close'].rolling(200).mean().iloc[-1]
+        close_6m = close[-_DAYS_6M:]
+        returns_6m = close_6m[1:] / close_6m[:-1] - 1.0
+        daily_std = returns_6m.std(ddof=1, dtype=np.float32) if returns_6m.size > 1 else np.nan  # matches Series.std()
+        volatility = _format_ratio(daily_std * _SQRT_252, is_percent=True)
+        # Only the latest SMA values are used, so average the trailing windows
+        sma_50 = close[-50:].mean() if close.size >= 50 else np.nan
+        sma_200 = close[-200:].mean() if close.size >= 200 else np.nan
 
         # --- 4. Generate AI Narrative ---
 
-        trend_6m_desc = "strong upward" if change_6m_pct > 15 else "upward" if change_6m_pct > 0 else "downward" if change_6m_pct < -5 else "stable"
+        trend_6m_desc = str(np.select(
+            [change_6m_pct > 15, change_6m_pct > 0, change_6m_pct < -5],
+            ["strong upward", "upward", "downward"], default="stable"))
         trend_10d_desc = "positive" if change_10d_pct > 0 else "negative"
         
         market_narrative = (
@@ -95,11 +82,12 @@ def generate_ai_summary(ticker: str):
         if pd.isna(sma_50) or pd.isna(sma_200):
             tech_narrative = "Insufficient data for full technical analysis."
         else:
-            tech_posture = "a bullish posture" if current_price > sma_50 and sma_50 > 200 else \
-                           "a bearish posture" if current_price < sma_50 and sma_50 < 200 else \
-                           "a mixed/transitional posture"
+            tech_posture = str(np.select(
+                [(current_price > sma_50) & (sma_50 > 200), (current_price < sma_50) & (sma_50 < 200)],
+                ["a bullish posture", "a bearish posture"], default="a mixed/transitional posture"))
             beta_val = 1.0 if pd.isna(beta) or beta == "N/A" else float(beta) 
-            beta_desc = "more volatile than" if beta_val > 1.1 else "less volatile than" if beta_val < 0.9 else "in line with"
+            beta_desc = str(np.select([beta_val > 1.1, beta_val < 0.9],
+                                      ["more volatile than", "less volatile than"], default="in line with"))
             
             # --- MODIFICATION: Removed all ** from variables ---
             tech_narrative = (
@@ -110,25 +98,20 @@ def generate_ai_summary(ticker: str):
                 f"A Beta of {beta} suggests the stock is {beta_desc} the broader market."
             )
 
-        def safe_float(value, default=0.0):
-            try:
-                return float(str(value).replace('%', '').replace('N/A', str(default)))
-            except (ValueError, TypeError):
-                return default
-
-        fwd_pe_val = safe_float(fwd_pe_ratio)
-        pe_val = safe_float(pe_ratio)
-        peg_val = safe_float(peg_ratio)
-        roe_val = safe_float(roe)
-        margin_val = safe_float(margin)
-        div_val = safe_float(dividend_yield)
-
-        val_desc = "potentially undervalued" if fwd_pe_val < pe_val and peg_val < 1 and fwd_pe_val > 0 and peg_val > 0 else \
-                   "appears fully valued" if pe_val > 30 or peg_val > 2 else \
-                   "at a reasonable valuation"
-        profit_desc = "exceptionally strong" if margin_val > 20 and roe_val > 20 else \
-                      "healthy" if margin_val > 10 and roe_val > 15 else \
-                      "an area for improvement"
+        # Parse the formatted strings back to numbers in one pass; "N/A" -> 0.0
+        parsed = (
+            pd.Series({'fwd_pe': fwd_pe_ratio, 'pe': pe_ratio, 'peg': peg_ratio,
+                       'roe': roe, 'margin': margin, 'div': dividend_yield})
+            .astype(str).str.extract(r'(-?\d+\.?\d*)')[0].astype(float).fillna(0.0)
+        )
+        fwd_pe_val, pe_val, peg_val, roe_val, margin_val, div_val = parsed.to_numpy()
+
+        val_desc = str(np.select(
+            [(fwd_pe_val < pe_val) & (peg_val < 1) & (fwd_pe_val > 0) & (peg_val > 0), (pe_val > 30) | (peg_val > 2)],
+            ["potentially undervalued", "appears fully valued"], default="at a reasonable valuation"))
+        profit_desc = str(np.select(
+            [(margin_val > 20) & (roe_val > 20), (margin_val > 10) & (roe_val > 15)],
+            ["exceptionally strong", "healthy"], default="an area for improvement"))
         
         # --- MODIFICATION: Removed all ** from variables ---
         fundamental_narrative = (
@@ -153,25 +136,41 @@ def generate_ai_summary(ticker: str):
                        f"justified by its fundamentals, showing a balanced profile between valuation and profitability.")
 
         # --- 6. Combine all parts into the final summary ---
-        summary = f"""
-### 🧠 Analysis
-
-**Market & Trend:**
-> {market_narrative}
+        return "\n".join((
+            "",
+            "### 🧠 Analysis",
+            "",
+            "**Market & Trend:**",
+            f"> {market_narrative}",
+            "",
+            "**Technical Posture:**",
+            f"> {tech_narrative}",
+            "",
+            "**Fundamentals:**",
+            f"> {fundamental_narrative}",
+            "",
+            "---",
+            "",
+            "### 💡 Analyst Insight",
+            f"> **{insight}**",
+            "",
+        ))
 
-**Technical Posture:**
-> {tech_narrative}
-
-**Fundamentals:**
-> {fundamental_narrative}
+    except Exception as e:
+        print(traceback.format_exc()) # For debugging in the console
+        return f"⚠️ An error occurred while generating the AI summary for **{ticker}**: {e}"
 
----
 
-### 💡 Analyst Insight
-> **{insight}**
-        """
-        return summary
+def generate_ai_summaries(tickers: list) -> dict:
+    """
+    Generates summaries for several tickers at once. Each summary is
+    network-bound, so they run on a thread pool.
 
-    except Exception as e:
-        print(traceback.format_exc()) # For debugging in the console
-        return f"⚠️ An error occurred while generating the AI summary for **{ticker}**: {e}"
\ No newline at end of file
+    Returns:
+        dict: {ticker: summary markdown}
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as ex:
+        return dict(zip(tickers, ex.map(generate_ai_summary, tickers)))
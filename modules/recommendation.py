@@ -6,36 +6,89 @@ from modules import fundamentals, forecast, sentiment
 import pandas as pd
 import yfinance as yf
 
+# Composite score cut-offs; a score equal to a cut-off takes the lower bucket
+_LABEL_EDGES = np.array([-0.6, -0.3, 0.3, 0.6])
+_LABELS = (("Strong Sell", "#D40000"), ("Sell", "#FF6B4E"), ("Hold", "#FFC107"),
+           ("Buy", "#88D66C"), ("Strong Buy", "#1ED760"))
+
+# Static parts of the recommendation gauge; get_recommendation copies this
+# and only fills in the score, label and colour.
+_GAUGE_TEMPLATE = go.Figure(go.Indicator(
+    mode="gauge+number+delta",
+    delta={"reference":0},
+    gauge={
+        "axis":{"range":[-100,100],"tickwidth":1,"tickcolor":"#8899AB"},
+        "bgcolor":"#101820", # Match theme background
+        "borderwidth":2,
+        "bordercolor":"#30363D",
+        "steps":[
+            {"range":[-100,-60],"color":"#D40000"},
+            {"range":[-60,-30],"color":"#FF6B4E"},
+            {"range":[-30,30],"color":"#FFC107"},
+            {"range":[30,60],"color":"#88D66C"},
+            {"range":[60,100],"color":"#1ED760"},
+        ],
+        "threshold":{"line":{"color":"white","width":3},"thickness":0.8}
+    },
+    title={"font":{"color":"white","size":20}}
+))
+_GAUGE_TEMPLATE.update_layout(
+    paper_bgcolor="#121A2A", # Match theme panel
+    font={"color":"white"},
+    height=280, 
+    margin=dict(t=60, b=20, l=30, r=30)
+)
+
+# Fundamental scoring ranges for (40 - P/E, ROE %, profit margin %, 200 - D/E %)
+_FUNDAMENTAL_LOWS = np.array([-20.0, 0.0, 0.0, -100.0])
+_FUNDAMENTAL_HIGHS = np.array([40.0, 25.0, 30.0, 200.0])
+
 def _normalize(value, low, high):
-    if value is None or np.isnan(value):
-        return 0
-    return max(-1, min(1, 2 * ((value - low) / (high - low)) - 1))
+    """
+    Maps value from [low, high] onto [-1, 1], clipped; missing values score 0.
+    Element-wise on arrays; a scalar in gives a scalar out.
+    """
+    value = np.asarray(value, dtype=np.float64)  # None -> NaN
+    scaled = np.clip(2 * ((value - low) / (high - low)) - 1, -1, 1)
+    return np.nan_to_num(scaled, nan=0.0)[()]
+
+def _label(comp: float):
+    """(label, colour) for a composite score; a NaN score is a Hold."""
+    if np.isnan(comp):
+        return _LABELS[2]
+    return _LABELS[np.searchsorted(_LABEL_EDGES, comp)]
+
+def _gauge_indicator(comp: float, label: str, color: str) -> go.Indicator:
+    """The template's Indicator trace filled in for one composite score."""
+    indicator = go.Indicator(_GAUGE_TEMPLATE.data[0])
+    indicator.value = comp*100
+    indicator.delta.increasing.color = color
+    indicator.delta.decreasing.color = color
+    indicator.gauge.bar.color = color
+    indicator.gauge.threshold.value = comp*100
+    indicator.title.text = f"<b>{label}</b>"
+    return indicator
 
 # --- MODIFICATION: Function now accepts pre-computed data ---
-def get_recommendation(company_name: str, hist_df: pd.DataFrame, simulations: np.ndarray, sentiment_score: float):
+def get_recommendation_data(company_name: str, hist_df: pd.DataFrame, simulations: np.ndarray, sentiment_score: float,
+                            metrics_num: dict = None):
     """
-    Generates Buy/Hold/Sell recommendation with
-    composite logic + interactive confidence gauge.
+    Generates the Buy/Hold/Sell recommendation without building a figure.
+    Returns (text, composite score, label, colour); on error the last three
+    are None.
+
+    metrics_num is the numeric dict from get_fundamentals; pass it when the
+    caller already has it so the fundamentals are not fetched a second time.
     """
     try:
         # ---------- Fundamentals ----------
-        metrics, _, _ = fundamentals.get_fundamentals(company_name)
-        
-        def safe_num(v):
-            try: return float(str(v).replace("%","").replace(",","").replace("$",""))
-            except: return np.nan
-
-        pe = safe_num(metrics.get("P/E Ratio"))
-        roe = safe_num(metrics.get("ROE"))
-        pm = safe_num(metrics.get("Profit Margin"))
-        de = safe_num(metrics.get("Debt-to-Equity"))
-
-        f_score = 0
-        if not np.isnan(pe):  f_score += _normalize(40 - pe, -20, 40)
-        if not np.isnan(roe): f_score += _normalize(roe, 0, 25)
-        if not np.isnan(pm):  f_score += _normalize(pm, 0, 30)
-        if not np.isnan(de):  f_score += _normalize(200 - de, -100, 200) # D/E is a %, so adjust scale
-        fundamental_score = f_score / 4 if f_score else 0
+        if not metrics_num:
+            _, _, _, metrics_num = fundamentals.get_fundamentals(company_name, with_figs=False)
+        pe, roe, pm, de = (metrics_num.get(k, np.nan) for k in ("P/E Ratio", "ROE", "Profit Margin", "Debt-to-Equity"))
+
+        # D/E is a %, so it is scored as 200 - D/E; missing metrics count as 0
+        raw = np.array([40 - pe, roe, pm, 200 - de], dtype=np.float64)
+        fundamental_score = _normalize(raw, _FUNDAMENTAL_LOWS, _FUNDAMENTAL_HIGHS).mean()
 
         # ---------- Forecast (MODIFIED) ----------
         try:
@@ -43,7 +96,7 @@ def get_recommendation(company_name: str, hist_df: pd.DataFrame, simulations: np
             last_actual = hist_df['y'].iloc[-1]
             
             # Get the median (50th percentile) of the final day's simulations
-            median_forecast_price = np.percentile(simulations[-1, :], 50)
+            median_forecast_price = np.quantile(simulations[-1], 0.5)
             
             # Create the sentiment-adjusted score
             sentiment_drift = (last_actual * sentiment_score * 0.1) # 10% nudge over 30 days
@@ -63,11 +116,7 @@ def get_recommendation(company_name: str, hist_df: pd.DataFrame, simulations: np
         comp = 0.4*forecast_score + 0.3*fundamental_score + 0.3*sentiment_score_normalized
         
         # Determine Label
-        if comp > 0.6: label, color = "Strong Buy","#1ED760"
-        elif comp > 0.3: label, color = "Buy","#88D66C"
-        elif comp > -0.3: label, color = "Hold","#FFC107"
-        elif comp > -0.6: label, color = "Sell","#FF6B4E"
-        else: label, color = "Strong Sell","#D40000"
+        label, color = _label(comp)
         
         # Determine Emoji
         if comp > 0.3: emoji = "📈"
@@ -88,37 +137,22 @@ def get_recommendation(company_name: str, hist_df: pd.DataFrame, simulations: np
             "AI blends simulation momentum, fundamental health and market tone for this signal."
         )
 
-        # ---------- Plotly Gauge ----------
-        gauge = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=comp*100,
-            delta={"reference":0,"increasing":{"color":color}, "decreasing":{"color":color}},
-            gauge={
-                "axis":{"range":[-100,100],"tickwidth":1,"tickcolor":"#8899AB"},
-                "bar":{"color":color},
-                "bgcolor":"#101820", # Match theme background
-                "borderwidth":2,
-                "bordercolor":"#30363D",
-                "steps":[
-                    {"range":[-100,-60],"color":"#D40000"},
-                    {"range":[-60,-30],"color":"#FF6B4E"},
-                    {"range":[-30,30],"color":"#FFC107"},
-                    {"range":[30,60],"color":"#88D66C"},
-                    {"range":[60,100],"color":"#1ED760"},
-                ],
-                "threshold":{"line":{"color":"white","width":3},"thickness":0.8,"value":comp*100}
-            },
-            title={"text":f"<b>{label}</b>", "font":{"color":"white","size":20}}
-        ))
-        
-        gauge.update_layout(
-            paper_bgcolor="#121A2A", # Match theme panel
-            font={"color":"white"},
-            height=280, 
-            margin=dict(t=60, b=20, l=30, r=30)
-        )
-
-        return text, gauge
+        return text, comp, label, color
 
     except Exception as e:
-        return f"⚠️ Error generating recommendation: {e}", None
\ No newline at end of file
+        return f"⚠️ Error generating recommendation: {e}", None, None, None
+
+def get_recommendation(company_name: str, hist_df: pd.DataFrame, simulations: np.ndarray, sentiment_score: float,
+                       metrics_num: dict = None):
+    """
+    Generates Buy/Hold/Sell recommendation with
+    composite logic + interactive confidence gauge.
+    """
+    text, comp, label, color = get_recommendation_data(
+        company_name, hist_df, simulations, sentiment_score, metrics_num)
+    if comp is None:
+        return text, None
+
+    # ---------- Plotly Gauge ----------
+    gauge = go.Figure(data=[_gauge_indicator(comp, label, color)], layout=_GAUGE_TEMPLATE.layout)
+    return text, gauge
@@ -1,5 +1,11 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
@@ -7,33 +13,213 @@ from modules import data_fetch
 import nltk
 nltk.download("vader_lexicon", quiet=True)
 
-# Load FinBERT model once
-_tokenizer = AutoTokenizer.from_pretrained("yiyanghkust/finbert-tone")
-_model = AutoModelForSequenceClassification.from_pretrained("yiyanghkust/finbert-tone")
+try:
+    import onnxruntime as ort
+except ImportError:  # optional: only needed for the ONNX backend
+    ort = None
+
+_FINBERT = "yiyanghkust/finbert-tone"
+# int8 ONNX export of FinBERT; built once with export_finbert_onnx()
+_ONNX_PATH = os.environ.get("FINBERT_ONNX_PATH", os.path.join("models", "finbert.int8.onnx"))
+
+# Headline batches are small; a few intra-op threads beat oversubscribing
+# every core, and there is no inter-op graph parallelism to exploit
+torch.set_num_threads(min(4, os.cpu_count() or 1))
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:  # only allowed before torch has started parallel work
+    pass
+
+_device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+@lru_cache(maxsize=None)
+def _load_tokenizer():
+    """FinBERT tokenizer, loaded on first use."""
+    return AutoTokenizer.from_pretrained(_FINBERT)
+
+@lru_cache(maxsize=None)
+def _load_finbert():
+    """
+    Loads FinBERT once, on the first call that needs it, and returns
+    (torch model, ONNX Runtime session), one of them None. The ONNX session
+    is used when onnxruntime and the exported model are both present,
+    otherwise PyTorch (on the GPU when available).
+    """
+    if ort is not None and os.path.exists(_ONNX_PATH):
+        return None, ort.InferenceSession(_ONNX_PATH, providers=["CPUExecutionProvider"])
+
+    model = AutoModelForSequenceClassification.from_pretrained(_FINBERT).to(_device).eval()
+    if _device.type == "cpu":
+        # Dynamic int8 on the Linear layers (weights quantized once, activations
+        # per call); the quantized kernels are CPU-only, so CUDA keeps bf16
+        if "fbgemm" in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = "fbgemm"
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model, None
+
 _labels = ["negative", "neutral", "positive"]
 _sia = SentimentIntensityAnalyzer() # Load VADER once
 
-def finbert_score(text):
-    """Compute FinBERT sentiment score (-1 to 1)."""
+_TONES = (
+    ("Bearish 😞", "#D40000"),  # Red
+    ("Neutral 😐", "#FFC107"),  # Gold
+    ("Bullish 😄", "#1ED760"),  # Green
+)
+
+# Headlines VADER already scores beyond ±this are taken at the VADER score;
+# FinBERT only runs on the ambiguous rest
+_VADER_CONFIDENT = 0.8
+
+# Scorers analyze_sentiment can use; "hybrid" blends FinBERT and VADER
+_BACKENDS = ("hybrid", "finbert", "vader")
+
+# Score per (backend, headline), kept across calls since polls see the same
+# news again; headlines are keyed lower-cased and whitespace-collapsed
+_SCORE_CACHE_SIZE = 4096
+_SCORE_CACHE: OrderedDict = OrderedDict()
+_SCORE_LOCK = threading.Lock()  # Streamlit sessions score on separate threads
+
+# Headlines are short; 64 tokens covers nearly all of them and keeps the
+# padded batch far smaller than the 512-token model limit
+_MAX_TOKENS = 64
+# Token-length buckets (<=16, <=32, longer) batched separately for FinBERT
+_LENGTH_BUCKETS = np.array([16, 32])
+
+def export_finbert_onnx(path: str = _ONNX_PATH):
+    """
+    One-off export of FinBERT to ONNX, dynamically quantized to int8, at
+    `path`. Restart the app afterwards to pick up the ONNX backend.
+    """
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    fp32_path = path.replace(".int8", "") if ".int8" in path else path + ".fp32"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    model = AutoModelForSequenceClassification.from_pretrained(_FINBERT).eval()
+    dummy = _load_tokenizer()(["export"], return_tensors="pt")
+    torch.onnx.export(
+        model, (dummy["input_ids"], dummy["attention_mask"]), fp32_path,
+        input_names=["input_ids", "attention_mask"], output_names=["logits"],
+        dynamic_axes={"input_ids": {0: "b", 1: "s"}, "attention_mask": {0: "b", 1: "s"},
+                      "logits": {0: "b"}},
+        opset_version=17,
+    )
+    quantize_dynamic(fp32_path, path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    return path
+
+def _onnx_scores(session, enc) -> np.ndarray:
+    """FinBERT scores for one padded batch on the ONNX Runtime session."""
+    logits = session.run(None, {"input_ids": enc["input_ids"].astype(np.int64),
+                                "attention_mask": enc["attention_mask"].astype(np.int64)})[0]
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=-1, keepdims=True)
+    return probs[:, 2] - probs[:, 0]  # Positive - Negative
+
+def _torch_scores(model, enc) -> np.ndarray:
+    """FinBERT scores for one padded batch on the PyTorch model."""
+    inputs = {k: torch.from_numpy(v).to(_device) for k, v in enc.items()}
+    # bf16 autocast runs the matmuls on Tensor Cores; it is a no-op on CPU
+    with torch.inference_mode(), torch.autocast(device_type=_device.type, dtype=torch.bfloat16,
+                                                enabled=_device.type == "cuda"):
+        logits = model(**inputs).logits
+    probs = torch.nn.functional.softmax(logits.float(), dim=-1)
+    return (probs[:, 2] - probs[:, 0]).cpu().numpy()  # Positive - Negative
+
+def finbert_scores_batch(texts: list) -> list:
+    """
+    Compute FinBERT sentiment scores (-1 to 1) for many texts. Texts are
+    tokenized once, grouped by token length and each group is run as one
+    padded forward pass, so short headlines are not padded out to the
+    longest one. Returns None if the model could not be loaded or run.
+    """
+    if not texts:
+        return []
     try:
-        inputs = _tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-        with torch.no_grad():
-            logits = _model(**inputs).logits
-        probs = torch.nn.functional.softmax(logits, dim=-1)
-        return float(probs[0, 2] - probs[0, 0])  # Positive - Negative
-    except Exception:
-        return 0.0
+        model, session = _load_finbert()
+        tokenizer = _load_tokenizer()
+        enc = tokenizer(texts, truncation=True, max_length=_MAX_TOKENS)
+        lengths = np.fromiter(map(len, enc["input_ids"]), dtype=np.int64, count=len(texts))
+        buckets = np.searchsorted(_LENGTH_BUCKETS, lengths)
+
+        scores = np.empty(len(texts))
+        for bucket in np.unique(buckets):
+            idx = np.flatnonzero(buckets == bucket)
+            batch = tokenizer.pad({k: [v[i] for i in idx] for k, v in enc.items()},
+                                  return_tensors="np")
+            scores[idx] = (_onnx_scores(session, batch) if session is not None
+                           else _torch_scores(model, batch))
+        return scores.tolist()
+    except Exception as e:
+        print(f"FinBERT scoring failed: {e}")
+        return None
+
+def finbert_score(text):
+    """Compute FinBERT sentiment score (-1 to 1); 0.0 if the model failed."""
+    scores = finbert_scores_batch([text])
+    return scores[0] if scores is not None else 0.0
+
+def _get_scores(texts: list, backend: str = "hybrid") -> np.ndarray:
+    """
+    Scores for a list of headlines with the given backend, as an array in
+    input order. Cached headlines are reused. For "hybrid", lexically
+    clear-cut headlines keep their VADER score and only the others go
+    through FinBERT, as one batch.
+    """
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {backend!r}; expected one of {_BACKENDS}")
+    keys = [(backend, " ".join(t.lower().split())) for t in texts]
+    scores = {}
+    misses = {}
+    with _SCORE_LOCK:
+        for t, key in zip(texts, keys):
+            score = _SCORE_CACHE.get(key)
+            if score is not None:
+                _SCORE_CACHE.move_to_end(key)
+                scores[key] = score
+            else:
+                misses.setdefault(key, t)
+
+    if misses:
+        new_texts = list(misses.values())
+        # A failed FinBERT call scores those headlines as neutral for this
+        # call only; nothing is cached, so the next call retries the model
+        cacheable = True
+        if backend == "finbert":
+            finbert = finbert_scores_batch(new_texts)
+            cacheable = finbert is not None
+            new_scores = np.asarray(finbert if cacheable else [0.0] * len(new_texts), dtype=np.float64)
+        else:
+            vader_arr = np.fromiter((_sia.polarity_scores(t)["compound"] for t in new_texts),
+                                    dtype=np.float64, count=len(new_texts))
+            new_scores = vader_arr.copy()
+            ambiguous = np.flatnonzero(np.abs(vader_arr) <= _VADER_CONFIDENT)
+            if backend == "hybrid" and ambiguous.size:
+                finbert = finbert_scores_batch([new_texts[i] for i in ambiguous])
+                cacheable = finbert is not None
+                finbert_arr = np.asarray(finbert if cacheable else [0.0] * ambiguous.size, dtype=np.float64)
+                new_scores[ambiguous] = 0.7 * finbert_arr + 0.3 * vader_arr[ambiguous]
+        scores.update(zip(misses, new_scores.tolist()))
+        if cacheable:
+            with _SCORE_LOCK:
+                for key in misses:
+                    _SCORE_CACHE[key] = scores[key]
+                    _SCORE_CACHE.move_to_end(key)
+                while len(_SCORE_CACHE) > _SCORE_CACHE_SIZE:
+                    _SCORE_CACHE.popitem(last=False)
+
+    return np.fromiter((scores[key] for key in keys), dtype=np.float64, count=len(keys))
 
 def _get_hybrid_score(text: str):
     """Helper to get a single hybrid score for one headline."""
-    vader_score = _sia.polarity_scores(text)["compound"]
-    finbert_s = finbert_score(text)
-    return 0.7 * finbert_s + 0.3 * vader_score
+    return float(_get_scores([text])[0])
 
-def analyze_sentiment(company_name: str):
+def analyze_sentiment(company_name: str, backend: str = "hybrid"):
     """
     Analyze recent news sentiment for a company using both
     VADER (lexical) and FinBERT (contextual financial) models.
+    backend picks the scorer: "hybrid" (default), "finbert" or "vader";
+    FinBERT is only loaded the first time a backend needs it.
     Returns (summary string, matplotlib figure, avg_sentiment float).
     """
     try:
@@ -55,24 +241,16 @@ def analyze_sentiment(company_name: str):
             return "No valid text headlines found.", None, 0.0
 
         # Calculate hybrid scores
-        hybrid_scores = [_get_hybrid_score(t) for t in valid]
+        hybrid_scores = _get_scores(valid, backend)
 
-        avg_sentiment = np.mean(hybrid_scores)
-        positive = sum(1 for s in hybrid_scores if s > 0.1)
-        negative = sum(1 for s in hybrid_scores if s < -0.1)
-        neutral = len(hybrid_scores) - positive - negative
+        avg_sentiment = float(hybrid_scores.mean())
+        positive = int((hybrid_scores > 0.1).sum())
+        negative = int((hybrid_scores < -0.1).sum())
+        neutral = hybrid_scores.size - positive - negative
         confidence = min(1.0, len(valid) / 40.0)
 
-        # Tone label
-        if avg_sentiment > 0.05:
-            tone = "Bullish 😄"
-            color = "#1ED760" # Green
-        elif avg_sentiment < -0.05:
-            tone = "Bearish 😞"
-            color = "#D40000" # Red
-        else:
-            tone = "Neutral 😐"
-            color = "#FFC107" # Gold
+        # Tone label: index 0 below -0.05, 2 above 0.05, 1 in between (inclusive)
+        tone, color = _TONES[int(avg_sentiment >= -0.05) + int(avg_sentiment > 0.05)]
 
         summary = (
             f"**Company Sentiment — {company_name}**\n\n"
@@ -85,7 +263,10 @@ def analyze_sentiment(company_name: str):
         )
 
         # ---- Visualization (Side-by-Side Bar + Pie) ----
-        fig, axes = plt.subplots(1, 2, figsize=(8.5, 2.3))
+        # Standalone Figure: never registered with pyplot, so it is freed with
+        # the last reference instead of piling up across refreshes
+        fig = Figure(figsize=(8.5, 2.3), layout="constrained")
+        axes = fig.subplots(1, 2)
         fig.patch.set_facecolor("#121A2A") # Panel BG
         
         # Bar
@@ -117,15 +298,13 @@ def analyze_sentiment(company_name: str):
         ax2.set_title("Sentiment Breakdown", color="white", fontsize=9)
         ax2.set_facecolor("#121A2A")
 
-        plt.tight_layout(pad=1.0)
-
         return summary, fig, avg_sentiment
 
     except Exception as e:
         return f"Error analyzing sentiment: {e}", None, 0.0
 
 # --- NEW FUNCTION ---
-def get_headline_sentiment_list(headlines: list):
+def get_headline_sentiment_list(headlines: list, backend: str = "hybrid"):
     """
     Takes a list of headline dicts and returns the same
     list with a 'score' key added to each.
@@ -133,7 +312,7 @@ def get_headline_sentiment_list(headlines: list):
     if not headlines:
         return []
 
-    output_list = []
+    kept = []
     seen = set()
     
     for h in headlines:
@@ -143,14 +322,12 @@ def get_headline_sentiment_list(headlines: list):
         if not title or len(title) < 8 or title in seen:
             continue
         seen.add(title)
-        
-        # Calculate hybrid score
-        score = _get_hybrid_score(title)
-        
-        output_list.append({
-            "Headline": title,
-            "Score": score,
-            "Link": h.get("link", "#")
-        })
-    
-    return output_list
\ No newline at end of file
+        kept.append((title, h.get("link", "#")))
+
+    # Calculate hybrid scores for all kept headlines at once
+    scores = _get_scores([title for title, _ in kept], backend).tolist()
+
+    return [
+        {"Headline": title, "Score": score, "Link": link}
+        for (title, link), score in zip(kept, scores)
+    ]
\ No newline at end of file
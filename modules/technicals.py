@@ -1,51 +1,155 @@
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
 def calculate_bbands(data: pd.DataFrame, length=20, std_dev=2):
-    """Calculates Bollinger Bands and appends them to the DataFrame."""
+    """Calculates Bollinger Bands; returns a copy of the DataFrame with them appended."""
     # Calculate Middle Band (SMA)
     middle_band = data['Close'].rolling(window=length).mean()
     # Calculate Standard Deviation
     std = data['Close'].rolling(window=length).std()
     
     # Calculate Upper and Lower Bands
-    data[f'BBU_{length}_{std_dev}_0'] = middle_band + (std * std_dev)
-    data[f'BBM_{length}_{std_dev}_0'] = middle_band
-    data[f'BBL_{length}_{std_dev}_0'] = middle_band - (std * std_dev)
-    return data
+    return data.assign(**{
+        f'BBU_{length}_{std_dev}_0': middle_band + (std * std_dev),
+        f'BBM_{length}_{std_dev}_0': middle_band,
+        f'BBL_{length}_{std_dev}_0': middle_band - (std * std_dev),
+    })
 
 def calculate_rsi(data: pd.DataFrame, length=14):
-    """Calculates the Relative Strength Index (RSI) and appends it."""
+    """Calculates the Relative Strength Index (RSI); returns a copy with it appended."""
     delta = data['Close'].diff(1)
     
     # Get positive and negative price changes
     gain = delta.where(delta > 0, 0)
     loss = -delta.where(delta < 0, 0)
 
-    # Calculate the exponential moving average of gain and loss
-    avg_gain = gain.ewm(com=length - 1, min_periods=length).mean()
-    avg_loss = loss.ewm(com=length - 1, min_periods=length).mean()
+    # Wilder smoothing of gain and loss, as the O(N) recursive EWM. The first
+    # gain and loss are 0, so the weight normalisation of the adjusted form
+    # (com=length - 1) cancels in rs and the RSI is the same as before.
+    alpha = 1.0 / length
+    avg_gain = gain.ewm(alpha=alpha, adjust=False, min_periods=length).mean()
+    avg_loss = loss.ewm(alpha=alpha, adjust=False, min_periods=length).mean()
 
     # Calculate RS
     rs = avg_gain / avg_loss
     
     # Calculate RSI
     rsi = 100 - (100 / (1 + rs))
-    data[f'RSI_{length}'] = rsi
-    return data
+    return data.assign(**{f'RSI_{length}': rsi})
 
 def calculate_macd(data: pd.DataFrame, fast=12, slow=26, signal=9):
-    """Calculates MACD and appends it."""
+    """Calculates MACD; returns a copy with the MACD, signal and histogram appended."""
     # Calculate Fast and Slow EMAs
     ema_fast = data['Close'].ewm(span=fast, adjust=False).mean()
     ema_slow = data['Close'].ewm(span=slow, adjust=False).mean()
     
     # Calculate MACD line
-    data[f'MACD_{fast}_{slow}_{signal}'] = ema_fast - ema_slow
+    macd = ema_fast - ema_slow
     
     # Calculate Signal line
-    data[f'MACDs_{fast}_{slow}_{signal}'] = data[f'MACD_{fast}_{slow}_{signal}'].ewm(span=signal, adjust=False).mean()
+    macd_signal = macd.ewm(span=signal, adjust=False).mean()
     
     # Calculate MACD Histogram
-    data[f'MACDh_{fast}_{slow}_{signal}'] = data[f'MACD_{fast}_{slow}_{signal}'] - data[f'MACDs_{fast}_{slow}_{signal}']
-    return data
\ No newline at end of file
+    return data.assign(**{
+        f'MACD_{fast}_{slow}_{signal}': macd,
+        f'MACDs_{fast}_{slow}_{signal}': macd_signal,
+        f'MACDh_{fast}_{slow}_{signal}': macd - macd_signal,
+    })
+
+if njit is not None:
+    @njit(cache=True)
+    def _compute_indicators(close, bb_len, bb_std, rsi_len, fast, slow, signal):
+        """
+        Bollinger Bands, RSI and MACD in one pass over a gap-free close array,
+        matching calculate_bbands / calculate_rsi / calculate_macd. Returns
+        (bbu, bbm, bbl, rsi, macd, macds, macdh).
+        """
+        n = close.shape[0]
+        bbu = np.full(n, np.nan)
+        bbm = np.full(n, np.nan)
+        bbl = np.full(n, np.nan)
+        rsi = np.full(n, np.nan)
+        macd = np.empty(n)
+        macds = np.empty(n)
+        macdh = np.empty(n)
+
+        a_fast = 2.0 / (fast + 1)
+        a_slow = 2.0 / (slow + 1)
+        a_sig = 2.0 / (signal + 1)
+        a_rsi = 1.0 / rsi_len
+        avg_gain = 0.0
+        avg_loss = 0.0
+
+        ema_fast = close[0]
+        ema_slow = close[0]
+        ema_sig = 0.0
+        for i in range(n):
+            x = close[i]
+
+            # MACD
+            if i > 0:
+                ema_fast = a_fast * x + (1.0 - a_fast) * ema_fast
+                ema_slow = a_slow * x + (1.0 - a_slow) * ema_slow
+            m = ema_fast - ema_slow
+            ema_sig = m if i == 0 else a_sig * m + (1.0 - a_sig) * ema_sig
+            macd[i] = m
+            macds[i] = ema_sig
+            macdh[i] = m - ema_sig
+
+            # RSI (the first bar has no change and counts as zero gain and loss)
+            delta = x - close[i - 1] if i > 0 else 0.0
+            avg_gain = a_rsi * (delta if delta > 0.0 else 0.0) + (1.0 - a_rsi) * avg_gain
+            avg_loss = a_rsi * (-delta if delta < 0.0 else 0.0) + (1.0 - a_rsi) * avg_loss
+            if i >= rsi_len - 1:
+                if avg_loss > 0.0:
+                    rs = avg_gain / avg_loss
+                    rsi[i] = 100.0 - 100.0 / (1.0 + rs)
+                elif avg_gain > 0.0:
+                    rsi[i] = 100.0  # rs is inf
+
+            # Bollinger Bands on the trailing bb_len window
+            if i >= bb_len - 1:
+                total = 0.0
+                for j in range(i - bb_len + 1, i + 1):
+                    total += close[j]
+                mean = total / bb_len
+                ss = 0.0
+                for j in range(i - bb_len + 1, i + 1):
+                    ss += (close[j] - mean) ** 2
+                sd = np.sqrt(ss / (bb_len - 1))
+                bbm[i] = mean
+                bbu[i] = mean + sd * bb_std
+                bbl[i] = mean - sd * bb_std
+
+        return bbu, bbm, bbl, rsi, macd, macds, macdh
+
+def calculate_all(data: pd.DataFrame, bb_length=20, std_dev=2, rsi_length=14, fast=12, slow=26, signal=9):
+    """
+    Returns a copy of the DataFrame with Bollinger Bands, RSI and MACD (same
+    columns as the individual calculate_* functions), computed in a single
+    pass over Close when numba is installed.
+    """
+    close = data['Close'].to_numpy(dtype=np.float64)
+    if njit is None or close.size == 0 or np.isnan(close).any():
+        # Without numba, or with gaps the fused kernel does not handle, use
+        # the pandas versions
+        data = calculate_bbands(data, bb_length, std_dev)
+        data = calculate_rsi(data, rsi_length)
+        return calculate_macd(data, fast, slow, signal)
+
+    bbu, bbm, bbl, rsi, macd, macds, macdh = _compute_indicators(
+        close, bb_length, float(std_dev), rsi_length, fast, slow, signal)
+    return data.assign(**{
+        f'BBU_{bb_length}_{std_dev}_0': bbu,
+        f'BBM_{bb_length}_{std_dev}_0': bbm,
+        f'BBL_{bb_length}_{std_dev}_0': bbl,
+        f'RSI_{rsi_length}': rsi,
+        f'MACD_{fast}_{slow}_{signal}': macd,
+        f'MACDs_{fast}_{slow}_{signal}': macds,
+        f'MACDh_{fast}_{slow}_{signal}': macdh,
+    })
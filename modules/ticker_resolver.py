@@ -1,6 +1,28 @@
 # modules/ticker_resolver.py
+import time
+import threading
+from collections import OrderedDict
 import requests
-import yfinance as yf
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search"
+_UA_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'}
+
+# Keep-alive session so repeated searches reuse the HTTPS connection to Yahoo
+_SESSION = requests.Session()
+_SESSION.headers.update(_UA_HEADERS)
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+))
+
+# Search results per normalised query; symbols for a name rarely change, so
+# hits are kept for a day. Empty results are not cached.
+_RESOLVE_TTL = 86400
+_RESOLVE_CACHE_SIZE = 1024
+_RESOLVE_CACHE: OrderedDict = OrderedDict()
+_RESOLVE_LOCK = threading.Lock()  # Streamlit sessions and API requests share it
 
 def find_ticker_options(company_name: str) -> list[dict]:
     """
@@ -11,13 +33,17 @@ def find_ticker_options(company_name: str) -> list[dict]:
         list[dict]: A list of dictionaries, e.g.,
         [{'ticker': 'AAPL', 'name': 'Apple Inc.', 'exchange': 'NMS'}, ...]
     """
-    
+    key = company_name.strip().upper()
+    with _RESOLVE_LOCK:
+        cached = _RESOLVE_CACHE.get(key)
+        if cached is not None and time.time() - cached[0] < _RESOLVE_TTL:
+            _RESOLVE_CACHE.move_to_end(key)
+            return [dict(o) for o in cached[1]]
+
     try:
-        user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
-        url = "https://query2.finance.yahoo.com/v1/finance/search"
         params = {"q": company_name, "quotes_count": 10, "lang": "en-US"} 
         
-        response = requests.get(url, params=params, headers={'User-Agent': user_agent})
+        response = _SESSION.get(_SEARCH_URL, params=params, timeout=5)
         
         if response.status_code != 200:
             return []
@@ -31,11 +57,18 @@ def find_ticker_options(company_name: str) -> list[dict]:
             if quote.get("quoteType") == "EQUITY":
                 options.append({
                     "ticker": quote.get("symbol"),
-                    "name": quote.get("longname", quote.get("shortname", "N/A")),
+                    # Names come from the search response itself; no per-symbol lookup
+                    "name": quote.get("longname") or quote.get("shortname") or "N/A",
                     "exchange": quote.get("exchDisp", "N/A") # Display exchange, e.g., "NYSE", "LSE"
                 })
         
-        return options
+        if options:
+            with _RESOLVE_LOCK:
+                _RESOLVE_CACHE[key] = (time.time(), options)
+                _RESOLVE_CACHE.move_to_end(key)
+                if len(_RESOLVE_CACHE) > _RESOLVE_CACHE_SIZE:
+                    _RESOLVE_CACHE.popitem(last=False)
+        return [dict(o) for o in options]
         
     except Exception:
         return []
\ No newline at end of file
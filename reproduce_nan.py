@@ -9,7 +9,7 @@ from modules import fundamentals
 def test_ticker(ticker):
     print(f"Testing ticker: {ticker}")
     try:
-        metrics, figs, profile = fundamentals.get_fundamentals(ticker)
+        metrics, figs, profile, _ = fundamentals.get_fundamentals(ticker)
         print("Metrics:")
         for k, v in metrics.items():
             print(f"  {k}: {v}")
@@ -0,0 +1,86 @@
+"""
+Offline checks for the price history cache in modules/data_fetch.py.
+yf.Ticker is replaced by a fake that returns queued results, so nothing is
+fetched; run with pytest or directly as a script.
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules import data_fetch
+
+
+class _FakeTicker:
+    """yf.Ticker stand-in; each history() call pops the next queued result."""
+
+    results = []
+    calls = 0
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def history(self, period, interval):
+        type(self).calls += 1
+        result = type(self).results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _history(closes):
+    dates = pd.date_range("2024-01-01", periods=len(closes), freq="D", name="Date")
+    return pd.DataFrame({"Open": closes, "Close": closes, "Volume": 1000}, index=dates)
+
+
+def _fetch_each(*results):
+    """get_price_history once per queued result, on a fresh cache."""
+    original = data_fetch.yf.Ticker
+    data_fetch.yf.Ticker = _FakeTicker
+    _FakeTicker.results = list(results)
+    _FakeTicker.calls = 0
+    data_fetch._cached_price_history.clear()
+    try:
+        return [data_fetch.get_price_history("TEST", period="1mo") for _ in results]
+    finally:
+        data_fetch.yf.Ticker = original
+        data_fetch._cached_price_history.clear()
+
+
+def test_history_is_cleaned_and_cached():
+    first, second = _fetch_each(_history([1.0, 2.0]), _history([9.0, 9.0]))
+    assert list(first.index) == ["2024-01-01", "2024-01-02"]
+    assert list(first["Close"]) == [1.0, 2.0]
+    assert second.equals(first)
+    assert _FakeTicker.calls == 1
+
+
+def test_empty_history_is_not_cached():
+    first, second = _fetch_each(pd.DataFrame(), _history([1.0, 2.0]))
+    assert first.empty
+    assert list(second["Close"]) == [1.0, 2.0]
+    assert _FakeTicker.calls == 2
+
+
+def test_failed_fetch_is_not_cached():
+    first, second = _fetch_each(RuntimeError("connection reset"), _history([1.0, 2.0]))
+    assert first.empty
+    assert list(second["Close"]) == [1.0, 2.0]
+    assert _FakeTicker.calls == 2
+
+
+def test_history_without_numeric_rows_is_not_cached():
+    unusable = _history([1.0, 2.0]).assign(Close=float("nan"))
+    first, second = _fetch_each(unusable, _history([3.0]))
+    assert first.empty
+    assert list(second["Close"]) == [3.0]
+    assert _FakeTicker.calls == 2
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: ok")
@@ -0,0 +1,106 @@
+"""
+Offline checks for the trend model and Monte Carlo paths in
+modules/forecast.py. The series are synthetic, so nothing is fetched; run
+with pytest or directly as a script.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules import forecast
+
+
+def _history(days=3 * 365, seasonal=0.0, noise=0.05, seed=0):
+    """Daily prices on a straight line, plus an optional yearly cycle and seeded noise."""
+    rng = np.random.default_rng(seed)
+    ds = pd.date_range("2021-01-01", periods=days, freq="D")
+    t = np.arange(days, dtype=np.float64)
+    y = 100 + 0.05 * t + seasonal * np.sin(2 * np.pi * t / 365.25) + rng.normal(0, noise, days)
+    return pd.DataFrame({"ds": ds, "y": y}), t
+
+
+def test_fit_trend_future_dates():
+    hist_df, _ = _history()
+    future_dates, yhat = forecast.fit_trend(hist_df, period=30)
+
+    assert len(future_dates) == len(yhat) == 30
+    assert future_dates.iloc[0] == hist_df["ds"].iloc[-1] + pd.Timedelta(days=1)
+    assert (future_dates.diff().dropna() == pd.Timedelta(days=1)).all()
+
+
+def test_fit_trend_extends_a_linear_series():
+    hist_df, t = _history()
+    _, yhat = forecast.fit_trend(hist_df, period=30)
+
+    expected = 100 + 0.05 * (t[-1] + np.arange(1, 31))
+    assert np.allclose(yhat, expected, rtol=2e-3)
+
+
+def test_fit_trend_keeps_yearly_seasonality():
+    hist_df, t = _history(seasonal=5.0)
+    _, yhat = forecast.fit_trend(hist_df, period=90)
+
+    t_future = t[-1] + np.arange(1, 91)
+    expected = 100 + 0.05 * t_future + 5.0 * np.sin(2 * np.pi * t_future / 365.25)
+    assert np.abs(yhat - expected).max() < 1.0
+
+
+def test_fit_trend_is_deterministic():
+    hist_df, _ = _history()
+    _, first = forecast.fit_trend(hist_df, period=30)
+    _, second = forecast.fit_trend(hist_df, period=30)
+    assert np.array_equal(first, second)
+
+
+# Path counts either side of the switch to the numba kernel
+NUMPY_SIMULATIONS = forecast.NUMBA_MIN_SIMULATIONS - 1
+NUMBA_SIMULATIONS = forecast.NUMBA_MIN_SIMULATIONS * 20
+
+
+def _paths(num_simulations, volatility=0.0, period=31):
+    drift = np.full(period - 1, 0.001)
+    volatilities = np.full(period - 1, volatility)
+    return forecast.simulate_paths(100.0, drift, volatilities, period, num_simulations)
+
+
+def test_simulate_paths_without_volatility_compounds_the_drift():
+    # With zero volatility every path is the drift compounded from the last price
+    expected = (100.0 * np.concatenate([[1.0], np.cumprod(np.full(30, 1.001))])).astype(np.float32)
+    for num_simulations in (NUMPY_SIMULATIONS, NUMBA_SIMULATIONS):
+        sims = _paths(num_simulations)
+        assert sims.shape == (31, num_simulations)
+        assert sims.dtype == np.float32
+        assert np.allclose(sims, expected[:, None], rtol=1e-5)
+
+
+def test_simulate_paths_numpy_and_numba_agree():
+    if forecast.njit is None:
+        return  # numba not installed; only the NumPy path exists
+    np.random.seed(0)
+    numpy_sims = _paths(NUMPY_SIMULATIONS, volatility=0.02)
+    numba_sims = _paths(NUMBA_SIMULATIONS, volatility=0.02)
+
+    assert numpy_sims.dtype == numba_sims.dtype == np.float32
+    assert (numpy_sims[0] == 100.0).all() and (numba_sims[0] == 100.0).all()
+    # The one-day shocks of both kernels have the requested spread
+    for sims in (numpy_sims, numba_sims):
+        step = sims[1] / sims[0] - 1
+        assert abs(step.std() / 0.02 - 1) < 0.1
+        assert abs(step.mean() - 0.001) < 0.002
+
+
+def test_simulate_paths_pads_short_inputs():
+    # Missing drift days are 0 and missing volatility days reuse the last value
+    sims = forecast.simulate_paths(100.0, np.array([0.01]), np.array([0.0]), 4, 10)
+    assert np.allclose(sims[:, 0], [100.0, 101.0, 101.0, 101.0])
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: ok")
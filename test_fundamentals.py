@@ -0,0 +1,126 @@
+"""
+Offline checks for the ratio math and chart cache in modules/fundamentals.py.
+Inputs are fixed numbers and frames, so nothing is fetched; run with pytest
+or as a script.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules import fundamentals
+
+
+def test_ratios_prefer_yahoo_values():
+    roe, roa, de = fundamentals._ratios(10.0, 50.0, 200.0, 40.0, 0.3, 0.07, 95.0)
+    assert (roe, roa, de) == (0.3, 0.07, 95.0)
+
+
+def test_ratios_fill_gaps_from_statements():
+    # ROE and ROA as fractions, D/E in percent, like Yahoo
+    roe, roa, de = fundamentals._ratios(10.0, 50.0, 200.0, 40.0, None, None, None)
+    assert np.isclose(roe, 0.2)
+    assert np.isclose(roa, 0.05)
+    assert np.isclose(de, 80.0)
+    assert fundamentals._format_ratio(roe, is_percent=True) == "20.00%"
+    assert fundamentals._format_ratio(de) == "80.00"
+
+
+def test_ratios_missing_or_zero_denominators_stay_nan():
+    roe, roa, de = fundamentals._ratios(10.0, 0.0, np.nan, 40.0, None, None, None)
+    assert np.isnan(roe) and np.isnan(roa) and np.isnan(de)
+
+
+def test_ratios_on_a_batch():
+    records = np.array([
+        [10.0, 50.0, 200.0, 40.0],
+        [5.0, np.nan, 100.0, np.nan],
+        [-2.0, 20.0, 0.0, 10.0],
+    ])
+    info_roe = np.array([np.nan, 0.12, np.nan])
+    info_roa = np.full(3, np.nan)
+    info_de = np.array([np.nan, np.nan, 150.0])
+    roe, roa, de = fundamentals._ratios(*records.T, info_roe, info_roa, info_de)
+
+    assert np.allclose(roe, [0.2, 0.12, -0.1])
+    assert np.allclose(roa, [0.05, 0.05, np.nan], equal_nan=True)
+    assert np.allclose(de, [80.0, np.nan, 150.0], equal_nan=True)
+    # A batch gives the same numbers as one call per ticker
+    for i, record in enumerate(records):
+        single = fundamentals._ratios(*record, info_roe[i], info_roa[i], info_de[i])
+        assert np.allclose(single, [roe[i], roa[i], de[i]], equal_nan=True)
+
+
+def _statements():
+    """Normalised income and cash flow statements plus info, as get_fundamentals passes them."""
+    periods = pd.to_datetime(["2024-12-31", "2023-12-31"])
+    fin = pd.DataFrame([[100e9, 90e9], [10e9, 9e9]], index=["totalrevenue", "netincome"], columns=periods)
+    cf = pd.DataFrame([[20e9, np.nan]], index=["totalcashfromoperatingactivities"], columns=periods)
+    info = {"totalStockholderEquity": 50e9, "totalAssets": 200e9, "totalLiab": 150e9}
+    return fin, cf, info
+
+
+def test_figures_are_fresh_per_call():
+    fundamentals._FIG_CACHE.clear()
+    fin, cf, info = _statements()
+    first = fundamentals._get_figures("TEST", "$", fin, cf, info)
+    second = fundamentals._get_figures("TEST", "€", fin, cf, info)
+
+    assert sorted(first) == sorted(second) == ["balance_sheet", "cash_flow", "rev_income"]
+    assert all(first[name] is not second[name] for name in first)
+    # One cached entry: the currency only changes the labels
+    assert len(fundamentals._FIG_CACHE) == 1
+    assert "€" in second["rev_income"].axes[0].get_legend().get_texts()[0].get_text()
+
+
+def test_cached_chart_values_are_read_only():
+    fundamentals._FIG_CACHE.clear()
+    fin, cf, info = _statements()
+    fundamentals._get_figures("TEST", "$", fin, cf, info)
+    data, = fundamentals._FIG_CACHE.values()
+
+    periods, revenue, net_income = data["rev_income"]
+    assert list(revenue) == [100.0, 90.0] and list(net_income) == [10.0, 9.0]
+    assert list(data["cash_flow"][1]) == [20.0, 0.0]  # a missing period plots as 0
+    assert list(data["balance_sheet"]) == [200.0, 150.0, 50.0]
+    for arr in (revenue, net_income, data["cash_flow"][1], data["balance_sheet"]):
+        assert not arr.flags.writeable
+
+
+def _fundamentals(info):
+    """get_fundamentals on fixed raw statements (yfinance's labels) and the given info."""
+    periods = pd.to_datetime(["2024-12-31", "2023-12-31"])
+    fin = pd.DataFrame([[100e9, 90e9], [10e9, 9e9]], index=["Total Revenue", "Net Income"], columns=periods)
+    bs = pd.DataFrame([[50e9, 45e9], [200e9, 190e9], [40e9, 42e9]],
+                      index=["Stockholders Equity", "Total Assets", "Total Debt"], columns=periods)
+    original = fundamentals._get_statements
+    fundamentals._get_statements = lambda symbol: (info, fin, bs, pd.DataFrame())
+    try:
+        return fundamentals.get_fundamentals("TEST", with_figs=False)
+    finally:
+        fundamentals._get_statements = original
+
+
+def test_statement_derived_ratios_are_labelled():
+    metrics, _, _, metrics_num = _fundamentals({})
+    assert metrics["ROE"] == "20.00% (from statements)"
+    assert metrics["Debt-to-Equity"] == "80.00% (from statements)"
+    assert np.isclose(metrics_num["ROE"], 20.0)
+    assert np.isclose(metrics_num["Debt-to-Equity"], 80.0)
+
+
+def test_yahoo_ratios_are_not_labelled():
+    metrics, _, _, metrics_num = _fundamentals({"returnOnEquity": 0.25, "debtToEquity": 95.0})
+    assert metrics["ROE"] == "25.00%"
+    assert metrics["Debt-to-Equity"] == "95.00%"
+    assert np.isclose(metrics_num["ROE"], 25.0)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: ok")
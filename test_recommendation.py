@@ -0,0 +1,86 @@
+"""
+Offline checks for modules/recommendation.py. Inputs are fixed, so nothing
+is fetched; run with pytest or directly as a script.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nltk
+import nltk.sentiment.vader
+
+
+class _NeutralVader:
+    """Stands in for VADER, which sentiment loads (and downloads) on import."""
+
+    def polarity_scores(self, text):
+        return {"compound": 0.0}
+
+
+nltk.download = lambda *args, **kwargs: True
+nltk.sentiment.vader.SentimentIntensityAnalyzer = _NeutralVader
+
+from modules import recommendation
+
+# P/E 20, ROE 25%, margin 30%, D/E 100% -> fundamental score 2/3
+METRICS_NUM = {"P/E Ratio": 20.0, "ROE": 25.0, "Profit Margin": 30.0, "Debt-to-Equity": 100.0}
+
+
+def _inputs(final_price=105.0):
+    """Last close 100 and every simulated path ending at final_price."""
+    hist_df = pd.DataFrame({"y": [98.0, 99.0, 100.0]})
+    simulations = np.full((30, 50), final_price)
+    return hist_df, simulations
+
+
+def test_normalize():
+    assert recommendation._normalize(5, -10, 10) == 0.5
+    assert recommendation._normalize(50, -10, 10) == 1.0
+    assert recommendation._normalize(-50, -10, 10) == -1.0
+    assert recommendation._normalize(None, -10, 10) == 0.0
+    scores = recommendation._normalize([0.0, np.nan, 25.0], 0.0, 25.0)
+    assert np.array_equal(scores, [-1.0, 0.0, 1.0])
+
+
+def test_label_edges():
+    # A score equal to a cut-off takes the lower bucket
+    cases = [(-1.0, "Strong Sell"), (-0.6, "Strong Sell"), (-0.59, "Sell"), (-0.3, "Sell"),
+             (0.0, "Hold"), (0.3, "Hold"), (0.31, "Buy"), (0.6, "Buy"), (0.61, "Strong Buy")]
+    for comp, expected in cases:
+        assert recommendation._label(comp)[0] == expected, comp
+    assert recommendation._label(np.nan) == ("Hold", "#FFC107")
+
+
+def test_gauge_from_fixed_inputs():
+    hist_df, simulations = _inputs()
+    text, gauge = recommendation.get_recommendation("TEST", hist_df, simulations, 0.0, METRICS_NUM)
+
+    # forecast +5% -> 0.5; 0.4 * 0.5 + 0.3 * 2/3 + 0.3 * 0 = 0.4
+    indicator = gauge.data[0]
+    assert np.isclose(indicator.value, 40.0)
+    assert np.isclose(indicator.gauge.threshold.value, 40.0)
+    assert tuple(indicator.gauge.axis.range) == (-100, 100)
+    assert indicator.gauge.bar.color == "#88D66C"
+    assert "Buy" in indicator.title.text
+    assert "**Action:** Buy" in text
+
+
+def test_gauge_template_is_not_mutated():
+    hist_df, simulations = _inputs()
+    _, first = recommendation.get_recommendation("TEST", hist_df, simulations, 0.0, METRICS_NUM)
+    _, second = recommendation.get_recommendation("TEST", *_inputs(80.0), -1.0, METRICS_NUM)
+
+    assert first is not second
+    assert np.isclose(first.data[0].value, 40.0)
+    assert recommendation._GAUGE_TEMPLATE.data[0].value is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: ok")
@@ -0,0 +1,108 @@
+"""
+Offline checks for the headline score cache in modules/sentiment.py. VADER
+and FinBERT are replaced by fixed scorers, so no model or lexicon is
+downloaded; run with pytest or directly as a script.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class _FixedVader:
+    """Stands in for VADER: 0.9 for 'surge', -0.9 for 'crash', else 0.1."""
+
+    def polarity_scores(self, text):
+        text = text.lower()
+        return {"compound": 0.9 if "surge" in text else -0.9 if "crash" in text else 0.1}
+
+
+import nltk
+import nltk.sentiment.vader
+nltk.download = lambda *args, **kwargs: True
+nltk.sentiment.vader.SentimentIntensityAnalyzer = _FixedVader
+
+from modules import sentiment
+
+
+class _FinBert:
+    """Records every batch it is asked to score; returns 0.5 each, or None to fail."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return None if self.fail else [0.5] * len(texts)
+
+
+def _scores(texts, backend="hybrid", finbert=None):
+    """sentiment._get_scores with finbert_scores_batch swapped for a fake."""
+    original = sentiment.finbert_scores_batch
+    sentiment.finbert_scores_batch = finbert or _FinBert()
+    try:
+        return sentiment._get_scores(texts, backend)
+    finally:
+        sentiment.finbert_scores_batch = original
+
+
+def _reset():
+    sentiment._SCORE_CACHE.clear()
+    sentiment._sia = _FixedVader()
+
+
+def test_hybrid_only_sends_ambiguous_headlines_to_finbert():
+    _reset()
+    finbert = _FinBert()
+    scores = _scores(["Shares surge", "Market crash", "Company files report"], finbert=finbert)
+
+    # Clear-cut headlines keep the VADER score; the rest are 0.7 FinBERT + 0.3 VADER
+    assert np.allclose(scores, [0.9, -0.9, 0.7 * 0.5 + 0.3 * 0.1])
+    assert finbert.batches == [["Company files report"]]
+
+
+def test_repeated_headlines_are_served_from_the_cache():
+    _reset()
+    _scores(["Company files report"])
+    finbert = _FinBert()
+    scores = _scores(["company  files REPORT", "Company files report"], finbert=finbert)
+
+    assert np.allclose(scores, 0.38)
+    assert finbert.batches == []
+
+
+def test_cache_is_per_backend():
+    _reset()
+    _scores(["Company files report"], backend="hybrid")
+    assert np.allclose(_scores(["Company files report"], backend="vader"), 0.1)
+    assert np.allclose(_scores(["Company files report"], backend="finbert"), 0.5)
+    assert len(sentiment._SCORE_CACHE) == 3
+
+
+def test_failed_finbert_call_is_not_cached():
+    _reset()
+    scores = _scores(["Company files report"], finbert=_FinBert(fail=True))
+    assert np.allclose(scores, 0.3 * 0.1)  # neutral FinBERT for this call only
+    assert len(sentiment._SCORE_CACHE) == 0
+
+    finbert = _FinBert()
+    assert np.allclose(_scores(["Company files report"], finbert=finbert), 0.38)
+    assert finbert.batches == [["Company files report"]]
+
+
+def test_unknown_backend_is_rejected():
+    try:
+        sentiment._get_scores(["Company files report"], "textblob")
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: ok")
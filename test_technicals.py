@@ -0,0 +1,59 @@
+"""
+Offline checks that technicals.calculate_all matches the individual pandas
+indicator functions. Prices are synthetic; run with pytest or as a script.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules import technicals
+
+
+def _pandas_indicators(df):
+    """The reference: each calculate_* function applied in turn."""
+    return technicals.calculate_macd(technicals.calculate_rsi(technicals.calculate_bbands(df)))
+
+
+def _assert_matches_pandas(df):
+    expected = _pandas_indicators(df)
+    result = technicals.calculate_all(df)
+    assert list(result.columns) == list(expected.columns)
+    for col in expected.columns:
+        assert np.allclose(result[col], expected[col], rtol=1e-9, atol=1e-9, equal_nan=True), col
+
+
+def test_calculate_all_matches_pandas_on_a_random_walk():
+    rng = np.random.default_rng(0)
+    _assert_matches_pandas(pd.DataFrame({"Close": 100 + rng.standard_normal(1260).cumsum()}))
+
+
+def test_calculate_all_matches_pandas_on_flat_and_rising_runs():
+    # Zero-loss stretches (RSI 100) and a flat stretch (no gains or losses)
+    close = np.concatenate([np.arange(1.0, 40.0), np.full(30, 39.0), np.linspace(39.0, 20.0, 30)])
+    _assert_matches_pandas(pd.DataFrame({"Close": close}))
+
+
+def test_calculate_all_with_gaps_uses_the_pandas_path():
+    df = pd.DataFrame({"Close": [1.0, np.nan, 3.0] * 10})
+    _assert_matches_pandas(df)
+
+
+def test_calculate_all_on_short_input():
+    _assert_matches_pandas(pd.DataFrame({"Close": [1.0, 2.0]}))
+
+
+def test_calculate_all_leaves_the_input_untouched():
+    df = pd.DataFrame({"Close": np.linspace(1.0, 2.0, 50)})
+    technicals.calculate_all(df)
+    assert list(df.columns) == ["Close"]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: ok")